@@ -0,0 +1,53 @@
+# app/api/v1/admin.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_db, get_current_admin_user
+from app.core.logger import get_request_id
+from app.crud import user as crud_user
+from app.models.user import User
+from app.schemas.note import NoteReprocessRequest, NoteReprocessResult
+from app.schemas.queue import OwnerBacklog, QueueStatus
+from app.tasks import fair_queue
+from app.tasks.reprocess import reprocess_notes
+from app.tasks.queue import q
+
+router = APIRouter()
+
+
+@router.get("/queue", response_model=QueueStatus)
+def read_queue_status(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Show the summarization backlog, including how many jobs each owner has waiting. (Admins only)
+    """
+    backlogs = fair_queue.owner_backlogs()
+    emails = {user.id: user.email for user in crud_user.get_users_by_ids(db, user_ids=list(backlogs))}
+    owners = [
+        OwnerBacklog(owner_id=owner_id, email=emails.get(owner_id), queued=queued)
+        for owner_id, queued in sorted(backlogs.items(), key=lambda item: item[1], reverse=True)
+    ]
+    return QueueStatus(ready=q.count, backlog=fair_queue.backlog_size(), owners=owners)
+
+
+@router.post("/notes/reprocess", response_model=NoteReprocessResult)
+def reprocess_finished_notes(
+        criteria: NoteReprocessRequest,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Summarize finished notes again, e.g. FAILED notes after a model outage. (Admins only)
+
+    - Select notes by status (FAILED by default), failure reason text, engine, owner and
+      creation time; 'dry_run' only counts them.
+    - Each request requeues one batch (REPROCESS_BATCH_SIZE notes, in id order) and
+      queues them through the outbox like new notes. While matching notes are left,
+      the response has a 'next_after_id': send the same selection again with it as
+      'after_id' to continue; 'matched' counts the notes left from that point.
+    - Safe to repeat: a note that is already queued again is not selected a second time.
+    - A whole run is available from the command line: 'python -m app.tasks.reprocess'.
+    """
+    return reprocess_notes(db, criteria=criteria, request_id=get_request_id(), max_batches=1)
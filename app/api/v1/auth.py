@@ -1,5 +1,6 @@
 # app/api/v1/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
@@ -13,27 +14,34 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=user_schema.UserPublic, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
         *,
         db: Session = Depends(get_db),
         user_in: user_schema.UserCreate,
 ):
     """
     Create a new user. Default role is AGENT.
+
+    The password is hashed on the password hashing process pool; the endpoint
+    returns 503 when that pool is saturated.
     """
-    user = crud_user.get_user_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud_user.get_user_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this email already exists in the system.",
         )
 
-    new_user = crud_user.create_user(db, user_in=user_in)
-    return new_user
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    new_user = await run_in_threadpool(
+        crud_user.create_user, db, user_in=user_in, hashed_password=hashed_password
+    )
+    # Validate in the threadpool as well: UserPublic lazy-loads the 'notes' relationship.
+    return await run_in_threadpool(user_schema.UserPublic.model_validate, new_user)
 
 
 @router.post("/login", response_model=token_schema.Token)
-def login_for_access_token(
+async def login_for_access_token(
         db: Session = Depends(get_db),
         form_data: OAuth2PasswordRequestForm = Depends()
 ):
@@ -42,9 +50,11 @@ def login_for_access_token(
 
     OAuth2PasswordRequestForm expects 'username' and 'password' fields in a form-data body.
     The 'username' field is used as the email for authentication.
+    Password verification runs on the password hashing process pool; the endpoint
+    returns 503 when that pool is saturated.
     """
-    user = crud_user.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(crud_user.get_user_by_email, db, email=form_data.username)
+    if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
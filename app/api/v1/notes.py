@@ -1,17 +1,43 @@
 # app/api/v1/notes.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_db, get_current_active_user
+from app.core import cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.dependencies import get_db, get_current_active_user, get_current_admin_user
+from app.core.logger import get_request_id
+from app.core.metrics import NOTES_CANCELLED, SUMMARIES_BY_ENGINE
+from app.core.responses import (
+    csv_stream,
+    etag_matches,
+    gzip_stream,
+    model_response,
+    ndjson_stream,
+    not_modified_response,
+    version_headers,
+)
 from app.crud import note as crud_note
+from app.models.note import NoteStatus, SummaryEngine
 from app.models.user import User, UserRole  # Import UserRole Enum
 from app.schemas.note import NoteCreate, NotePublic
-from app.tasks.queue import q
-from app.tasks.summarize_task import summarize_text_task
+from app.tasks import cancellation, extractive, fair_queue, note_events
+from app.tasks.admission import enforce_admission
 
 router = APIRouter()
 
+# Adapters used to serialize the hot read endpoints straight to JSON bytes.
+note_adapter = TypeAdapter(NotePublic)
+note_list_adapter = TypeAdapter(List[NotePublic])
+
 
 @router.post("/", response_model=NotePublic, status_code=status.HTTP_201_CREATED)
 def create_new_note(
@@ -24,41 +50,238 @@ def create_new_note(
     Create a new note and enqueue it for summarization.
 
     - Any authenticated and active user (AGENT or ADMIN) can create a note.
-    - The note is saved to the database with a 'QUEUED' status.
-    - A background job is enqueued to Redis to process the summarization.
+    - The note is saved to the database with a 'QUEUED' status, in the same transaction
+      as an outbox row from which the dispatcher enqueues the summarization job. The
+      request does not wait on Redis. Jobs are scheduled round-robin across owners, so
+      bulk submissions don't starve other users.
     - The initial state of the note is returned immediately to the user.
+    - When the backlog is too long (or the user has too many pending notes) the note is
+      rejected with 503 (or 429) and a Retry-After header instead.
+    - With 'deadline_seconds', the note becomes 'EXPIRED' instead of being summarized
+      if no worker picks it up in time.
+    - With engine 'EXTRACTIVE', key sentences are selected right away and the note is
+      returned 'DONE', without queueing or admission control.
     """
-    note = crud_note.create_note(db=db, note_in=note_in, owner_id=current_user.id)
-    q.enqueue(summarize_text_task, note.id)
+    if note_in.engine == SummaryEngine.EXTRACTIVE:
+        # About a millisecond of NumPy: summarize inline instead of queueing.
+        started = time.perf_counter()
+        summary = extractive.summarize(note_in.raw_text)
+        note = crud_note.create_summarized_note(
+            db=db,
+            note_in=note_in,
+            owner_id=current_user.id,
+            summary=summary,
+            engine=SummaryEngine.EXTRACTIVE,
+            processing_time_ms=(time.perf_counter() - started) * 1000,
+        )
+        SUMMARIES_BY_ENGINE.labels(engine=SummaryEngine.EXTRACTIVE.value, reason="requested").inc()
+        return note
+
+    enforce_admission(db, current_user)
+    # The request id travels with the job so the worker's log lines can be correlated.
+    note = crud_note.create_note(
+        db=db,
+        note_in=note_in,
+        owner_id=current_user.id,
+        weight=fair_queue.weight_for_role(current_user.role),
+        request_id=get_request_id(),
+    )
     return note
 
 
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+# Declared before '/{note_id}' so that 'export' is not taken for a note id.
+@router.get("/export", response_class=StreamingResponse)
+def export_notes(
+    *,
+    current_user: User = Depends(get_current_active_user),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    note_status: Optional[NoteStatus] = Query(None, alias="status"),
+    owner_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    gzip: bool = False,
+):
+    """
+    Stream notes as NDJSON (one JSON object per line) or CSV, for offline analysis.
+
+    - AGENTs export their own notes; ADMINs export all notes, or one owner's with 'owner_id'.
+    - Filter by 'status' and by creation time ('created_from' inclusive, 'created_to' exclusive).
+    - Notes are read from a server-side cursor in id order and written out as they are
+      read, so exports of any size use constant memory.
+    - With 'gzip=true' the body is a gzip file compressed on the fly.
+    """
+    if current_user.role != UserRole.ADMIN:
+        if owner_id is not None and owner_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to export other users' notes.",
+            )
+        owner_id = current_user.id
+
+    def rows():
+        # The request's session is closed before the body is streamed; use our own.
+        db = SessionLocal()
+        try:
+            yield from crud_note.stream_notes_for_export(
+                db,
+                owner_id=owner_id,
+                status=note_status,
+                created_from=created_from,
+                created_to=created_to,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+            )
+        finally:
+            db.close()
+
+    encode = ndjson_stream if export_format == "ndjson" else csv_stream
+    body = encode(rows(), crud_note.EXPORT_COLUMNS)
+    filename = f"notes.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if gzip:
+        body = gzip_stream(body, level=settings.EXPORT_GZIP_LEVEL)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{note_id}", response_model=NotePublic)
 def get_note_by_id(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     note_id: int,
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Retrieve the details of a specific note, including its status and summary.
 
     - AGENTs can only retrieve notes they own.
     - ADMINs can retrieve any note.
+    - The response carries ETag/Last-Modified headers. A request whose If-None-Match
+      matches the current version gets an empty 304 without the full row being loaded.
+    - Notes that are 'DONE' or 'FAILED' are served from a cache, without loading the note.
     """
-    note = crud_note.get_note(db=db, note_id=note_id)
+    cached = cache.get_note(note_id)
+    if cached is not None:
+        if current_user.role != UserRole.ADMIN and cached.owner_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to access this note.",
+            )
+        if etag_matches(if_none_match, cached.headers["ETag"]):
+            return not_modified_response(cached.headers)
+        return Response(content=cached.body, headers=cached.headers, media_type="application/json")
 
-    if not note:
+    version = crud_note.get_note_version(db=db, note_id=note_id)
+
+    if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
 
     # Authorization check
-    if current_user.role != UserRole.ADMIN and note.owner_id != current_user.id:
+    if current_user.role != UserRole.ADMIN and version.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this note.",
         )
 
-    return note
+    headers = version_headers([version])
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified_response(headers)
+
+    note = crud_note.get_note(db=db, note_id=note_id)
+    if not note:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+
+    # Finished notes no longer change: cache them for the next poll.
+    cached = cache.store_note(db, note=note)
+    if cached is not None:
+        return Response(content=cached.body, headers=cached.headers, media_type="application/json")
+    # Derive the validators from the loaded row in case it changed since the version lookup.
+    return model_response(note_adapter, note, headers=version_headers([note]))
+
+
+# Statuses after which a note's stream ends.
+FINAL_STATUSES = {
+    NoteStatus.DONE.value, NoteStatus.FAILED.value, NoteStatus.CANCELLED.value, NoteStatus.EXPIRED.value,
+    note_events.DELETED,
+}
+
+
+def _note_status(note_id: int, current_user: Optional[User] = None) -> str:
+    """
+    The note's current status value (DELETED if it is gone). Checks access when a user is given.
+    """
+    cached = cache.get_note(note_id)
+    if cached is not None:
+        owner_id, status_value = cached.owner_id, json.loads(cached.body)["status"]
+    else:
+        db = SessionLocal()
+        try:
+            version = crud_note.get_note_version(db=db, note_id=note_id)
+        finally:
+            db.close()
+        if not version:
+            if current_user is not None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+            return note_events.DELETED
+        owner_id, status_value = version.owner_id, version.status.value
+    if current_user is not None and current_user.role != UserRole.ADMIN and owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this note.",
+        )
+    return status_value
+
+
+def _status_event(note_id: int, status_value: str) -> str:
+    return f"event: status\ndata: {json.dumps({'id': note_id, 'status': status_value})}\n\n"
+
+
+@router.get("/{note_id}/events", response_class=StreamingResponse)
+async def stream_note_status(
+    *,
+    current_user: User = Depends(get_current_active_user),
+    note_id: int,
+):
+    """
+    Follow a note's status as Server-Sent Events instead of polling it.
+
+    - Sends the current status right away, then one 'status' event per change, and
+      ends once the note is 'DONE', 'FAILED', 'CANCELLED', 'EXPIRED' or 'DELETED'.
+    - Idle streams get a keepalive comment every NOTE_EVENTS_KEEPALIVE_SECONDS.
+    - Same access rules as GET /notes/{note_id}.
+    """
+    initial = await run_in_threadpool(_note_status, note_id, current_user)
+
+    async def events():
+        last = initial
+        yield _status_event(note_id, last)
+        if last in FINAL_STATUSES:
+            return
+        async with note_events.hub.subscribe(note_id) as updates:
+            # The note may have changed between the first read and the subscription.
+            current = await run_in_threadpool(_note_status, note_id)
+            while True:
+                if current != last:
+                    last = current
+                    yield _status_event(note_id, last)
+                    if last in FINAL_STATUSES:
+                        return
+                try:
+                    current = await asyncio.wait_for(updates.get(), timeout=settings.NOTE_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Also catches changes that were not published (e.g. bulk expiry).
+                    yield ": keepalive\n\n"
+                    current = await run_in_threadpool(_note_status, note_id)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/", response_model=List[NotePublic])
@@ -68,13 +291,22 @@ def list_notes(
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     List notes with pagination.
 
     - AGENTs will see a list of their own notes.
     - ADMINs will see a list of all notes in the system.
+    - The ETag covers the ids, statuses and modification times of the page, so an
+      unchanged page is answered with 304 after a query that skips raw_text.
     """
+    owner_filter = None if current_user.role == UserRole.ADMIN else current_user.id
+    versions = crud_note.get_note_versions(db, owner_id=owner_filter, skip=skip, limit=limit)
+    headers = version_headers(versions)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified_response(headers)
+
     if current_user.role == UserRole.ADMIN:
         notes = crud_note.get_all_notes(db, skip=skip, limit=limit)
     else:  # AGENT
@@ -82,4 +314,100 @@ def list_notes(
             db, owner_id=current_user.id, skip=skip, limit=limit
         )
 
-    return notes
\ No newline at end of file
+    return model_response(note_list_adapter, notes, headers=version_headers(notes))
+
+
+@router.get("/{note_id}/profile", response_class=Response)
+def download_note_profile(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+    note_id: int,
+):
+    """
+    Download the sampled cProfile capture of a note's summarization job. (Admins only)
+
+    The file can be opened with 'python -m pstats note-<id>.prof' or tools like snakeviz.
+    Only 1 in PROFILE_SAMPLE_RATE jobs is profiled, so most notes have no profile.
+    """
+    profile = crud_note.get_note_profile(db, note_id=note_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile was captured for this note")
+
+    return Response(
+        content=profile.data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="note-{note_id}.prof"'},
+    )
+
+
+def _get_authorized_note(db: Session, note_id: int, current_user: User):
+    note = crud_note.get_note(db=db, note_id=note_id)
+    if not note:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+    if current_user.role != UserRole.ADMIN and note.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this note.",
+        )
+    return note
+
+
+def _cancel_pending_work(db: Session, note) -> bool:
+    # Flip the status first: from then on no worker will claim the note.
+    stage = "processing" if note.status == NoteStatus.PROCESSING else "queued"
+    if not crud_note.cancel_note(db, note_id=note.id):
+        return False
+    cancellation.withdraw(note)
+    note_events.publish_status(note.id, NoteStatus.CANCELLED)
+    NOTES_CANCELLED.labels(stage=stage).inc()
+    db.refresh(note)
+    return True
+
+
+@router.post("/{note_id}/cancel", response_model=NotePublic)
+def cancel_note(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    note_id: int,
+):
+    """
+    Cancel the summarization of a note that is still QUEUED or PROCESSING.
+
+    - A queued job is removed from the queue; a running one stops between decode steps.
+    - The note is kept with status 'CANCELLED'.
+    - Notes that have already finished cannot be cancelled (409).
+    """
+    note = _get_authorized_note(db, note_id, current_user)
+    if not _cancel_pending_work(db, note):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Note is already {note.status.value} and can no longer be cancelled.",
+        )
+    return note
+
+
+@router.delete("/{note_id}", response_model=NotePublic)
+def delete_note(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    note_id: int,
+):
+    """
+    Delete a note. If it is still being summarized, the work is cancelled first.
+
+    - AGENTs can only delete notes they own.
+    - ADMINs can delete any note.
+    - Returns the note as it was when deleted.
+    """
+    note = _get_authorized_note(db, note_id, current_user)
+    if note.status in (NoteStatus.QUEUED, NoteStatus.PROCESSING):
+        _cancel_pending_work(db, note)
+    # Serialize before deleting; the owner can't be loaded from a deleted row.
+    deleted = NotePublic.model_validate(note)
+    crud_note.delete_note(db, note_id=note_id)
+    cache.invalidate_notes([note_id])
+    note_events.publish_status(note_id, note_events.DELETED)
+    return deleted
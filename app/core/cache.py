@@ -0,0 +1,226 @@
+# app/core/cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Hashable, Iterable, Optional, TypeVar
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import NOTE_CACHE_LOOKUPS
+from app.core.responses import version_headers
+from app.crud.note import get_note_version
+from app.models.note import NoteStatus
+from app.schemas.note import NotePublic
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# In-process LRU
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+class LRUCache(Generic[V]):
+    """
+    A thread-safe LRU map with a per-entry time to live. A maxsize or ttl of 0
+    disables the cache (get always misses).
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Finished Note Responses
+# A note that is DONE or FAILED does not change any more, so GET /notes/{note_id}
+# can serve the serialized NotePublic without loading the row. Entries carry the
+# owner id (for the authorization check) and the ETag/Last-Modified headers.
+# There are two tiers:
+#   - an LRU in each API process (NOTE_CACHE_SIZE entries, NOTE_CACHE_LOCAL_TTL_SECONDS),
+#   - a Redis hash per note shared by all processes (NOTE_CACHE_REDIS_TTL_SECONDS,
+#     0 disables it), which workers fill as soon as they write a final state.
+# Deleting or reprocessing a note removes it from Redis and the local LRU, then
+# publishes the ids on INVALIDATE_CHANNEL so every API process drops its local copy
+# (see app/tasks/note_events.py). A process that loses its subscription clears its
+# whole LRU once it is back, so missed invalidations cannot outlive a reconnect.
+#
+# A reader can load a note just before it is requeued and store it just after the
+# invalidation. store_note therefore re-reads the note's status and updated_at after
+# writing to Redis and removes the entry if they no longer match; since invalidation
+# always follows the change, one of the two removals sees the new version.
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+CACHEABLE_STATUSES = (NoteStatus.DONE, NoteStatus.FAILED)
+REDIS_KEY_PREFIX = "summarizer:note:"
+INVALIDATE_CHANNEL = "summarizer:note-cache:invalidate"
+
+_note_adapter = TypeAdapter(NotePublic)
+
+
+@dataclass(frozen=True)
+class CachedNote:
+    """
+    A serialized finished note, as served by GET /notes/{note_id}.
+    """
+    owner_id: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+_local: LRUCache[CachedNote] = LRUCache(settings.NOTE_CACHE_SIZE, settings.NOTE_CACHE_LOCAL_TTL_SECONDS)
+
+
+def _redis():
+    # Imported lazily: app.tasks.queue connects to Redis, which the API does anyway.
+    from app.tasks.queue import q
+    return q.connection
+
+
+def _redis_key(note_id: int) -> str:
+    return f"{REDIS_KEY_PREFIX}{note_id}"
+
+
+def get_note(note_id: int) -> Optional[CachedNote]:
+    """
+    The cached response of a finished note, or None.
+    """
+    cached = _local.get(note_id)
+    if cached is not None:
+        NOTE_CACHE_LOOKUPS.labels(result="local_hit").inc()
+        return cached
+
+    if settings.NOTE_CACHE_REDIS_TTL_SECONDS > 0:
+        try:
+            fields = _redis().hgetall(_redis_key(note_id))
+        except Exception as e:
+            logger.warning(f"Could not read note {note_id} from the Redis cache: {e}")
+            fields = None
+        if fields:
+            cached = CachedNote(
+                owner_id=int(fields[b"owner_id"]),
+                body=fields[b"body"],
+                headers={
+                    name.decode()[len("header:"):]: value.decode()
+                    for name, value in fields.items() if name.startswith(b"header:")
+                },
+            )
+            _local.set(note_id, cached)
+            NOTE_CACHE_LOOKUPS.labels(result="redis_hit").inc()
+            return cached
+
+    NOTE_CACHE_LOOKUPS.labels(result="miss").inc()
+    return None
+
+
+def _is_current(db: Session, note: Any) -> bool:
+    version = get_note_version(db, note_id=note.id)
+    return (
+        version is not None
+        and version.status == note.status
+        and version.updated_at == note.updated_at
+    )
+
+
+def store_note(db: Session, *, note: Any, local: bool = True) -> Optional[CachedNote]:
+    """
+    Serializes a note and caches it if it is in a final state. Returns the entry, or
+    None if the note is not cacheable. Nothing stays cached if the row has changed
+    since the note was loaded. Failures to reach Redis are logged, not raised.
+    local=False only writes the Redis tier (for processes that never serve notes).
+    """
+    if note.status not in CACHEABLE_STATUSES:
+        return None
+    cached = CachedNote(
+        owner_id=note.owner_id,
+        body=_note_adapter.dump_json(_note_adapter.validate_python(note, from_attributes=True)),
+        headers=version_headers([note]),
+    )
+
+    stored = False
+    if settings.NOTE_CACHE_REDIS_TTL_SECONDS > 0:
+        mapping = {"owner_id": cached.owner_id, "body": cached.body}
+        mapping.update({f"header:{name}": value for name, value in cached.headers.items()})
+        try:
+            pipe = _redis().pipeline()
+            pipe.hset(_redis_key(note.id), mapping=mapping)
+            pipe.expire(_redis_key(note.id), settings.NOTE_CACHE_REDIS_TTL_SECONDS)
+            pipe.execute()
+            stored = True
+        except Exception as e:
+            logger.warning(f"Could not write note {note.id} to the Redis cache: {e}")
+
+    # Checked after the Redis write, not before: see the section comment.
+    if not _is_current(db, note):
+        if stored:
+            invalidate_notes([note.id], broadcast=False)
+        return None
+    if local:
+        _local.set(note.id, cached)
+    return cached
+
+
+def drop_local(note_ids: Iterable[int]) -> None:
+    """
+    Drops notes from this process's LRU only.
+    """
+    for note_id in note_ids:
+        _local.delete(note_id)
+
+
+def clear_local() -> None:
+    _local.clear()
+
+
+def invalidate_notes(note_ids: Iterable[int], *, broadcast: bool = True) -> None:
+    """
+    Drops notes from both tiers, e.g. when they are deleted or queued again, and tells
+    the other API processes to drop their local copies (unless broadcast is False).
+    """
+    note_ids = list(note_ids)
+    if not note_ids:
+        return
+    drop_local(note_ids)
+    try:
+        if settings.NOTE_CACHE_REDIS_TTL_SECONDS > 0:
+            _redis().delete(*(_redis_key(note_id) for note_id in note_ids))
+        if broadcast:
+            _redis().publish(INVALIDATE_CHANNEL, ",".join(str(note_id) for note_id in note_ids))
+    except Exception as e:
+        logger.warning(f"Could not invalidate {len(note_ids)} notes in the Redis cache: {e}")
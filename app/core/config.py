@@ -1,6 +1,7 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import List
 
 class Settings(BaseSettings):
     # ... (tüm ayarların aynı kalacak) ...
@@ -17,6 +18,113 @@ class Settings(BaseSettings):
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     REDIS_URL: str = Field(..., env="REDIS_URL")
 
+    # Redis connection pool shared by each process (see app/core/redis.py)
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+
+    # Password hashing (bcrypt runs in a dedicated process pool, see app/core/security.py)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Logging (see app/core/logger.py). LOG_FORMAT is "json" or "text".
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+
+    # Summarization (see app/tasks/summarize_task.py)
+    SUMMARY_NUM_BEAMS: int = 4
+    SUMMARY_MAX_INPUT_TOKENS: int = 1024
+    # Inputs longer than SUMMARY_MAX_INPUT_TOKENS are summarized map-reduce style: split into
+    # chunks of up to SUMMARY_CHUNK_TOKENS on sentence boundaries (consecutive chunks share
+    # SUMMARY_CHUNK_OVERLAP_SENTENCES sentences), summarized together, then summarized again.
+    # 0 disables chunking, and long inputs are truncated instead.
+    SUMMARY_CHUNK_TOKENS: int = 512
+    SUMMARY_CHUNK_OVERLAP_SENTENCES: int = 1
+    SUMMARY_MAX_MAP_PASSES: int = 3
+
+    # Admission control for new notes (see app/tasks/admission.py). 0 disables a limit.
+    ADMISSION_MAX_QUEUE_DEPTH: int = 5000
+    ADMISSION_MAX_WAIT_SECONDS: int = 900
+    ADMISSION_THROUGHPUT_WINDOW_MINUTES: int = 5
+    ADMISSION_FALLBACK_SECONDS_PER_JOB: float = 2.0
+    # Completions needed in the window before the measured throughput replaces the fallback
+    ADMISSION_MIN_COMPLETIONS: int = 10
+    USER_MAX_PENDING_NOTES: int = 0
+
+    # Fair scheduling across owners (see app/tasks/fair_queue.py)
+    FAIR_QUEUE_READY_DEPTH: int = 4
+    FAIR_QUEUE_AGENT_WEIGHT: int = 1
+    FAIR_QUEUE_ADMIN_WEIGHT: int = 2
+
+    # Outbox dispatcher and stuck-note reconciler (python -m app.tasks.dispatcher)
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.2
+    RECONCILE_INTERVAL_SECONDS: float = 60.0
+    RECONCILE_STUCK_AFTER_SECONDS: float = 900.0
+    RECONCILE_MAX_ATTEMPTS: int = 3
+
+    # Admin reprocessing (POST /admin/notes/reprocess, python -m app.tasks.reprocess): notes
+    # requeued per transaction, and the pause between batches so the dispatcher and the
+    # database are not flooded
+    REPROCESS_BATCH_SIZE: int = 500
+    REPROCESS_BATCH_PAUSE_SECONDS: float = 0.5
+
+    # Extractive engine (app/tasks/extractive.py): summary length, and the queue depth at
+    # which workers stop using T5 and fall back to it (0 disables the fallback)
+    EXTRACTIVE_MAX_SENTENCES: int = 3
+    EXTRACTIVE_SUMMARY_RATIO: float = 0.25
+    EXTRACTIVE_FALLBACK_BACKLOG: int = 2000
+
+    # How often a running generation checks whether its note was cancelled
+    ABORT_CHECK_INTERVAL_SECONDS: float = 0.5
+
+    # Worker autoscaler (python -m app.tasks.autoscaler)
+    AUTOSCALER_MIN_WORKERS: int = 1
+    AUTOSCALER_MAX_WORKERS: int = 4
+    AUTOSCALER_INTERVAL_SECONDS: float = 5.0
+    AUTOSCALER_JOBS_PER_WORKER: int = 20
+    AUTOSCALER_MAX_JOB_AGE_SECONDS: float = 60.0
+    AUTOSCALER_MAX_CPU_PERCENT: float = 90.0
+    AUTOSCALER_SCALE_UP_COOLDOWN_SECONDS: float = 30.0
+    AUTOSCALER_SCALE_DOWN_COOLDOWN_SECONDS: float = 300.0
+
+    # Worker start-up (app/tasks/worker.py): input lengths, in tokens, of the synthetic
+    # summaries run before taking jobs (empty disables warmup), and how long the
+    # readiness key outlives a worker that stopped sending heartbeats
+    WORKER_WARMUP_TOKENS: List[int] = [32, 256, 1024]
+    WORKER_READY_TTL_SECONDS: int = 60
+    # A worker stops taking jobs and exits (to be replaced by the autoscaler) once its RSS,
+    # or CUDA memory reserved by PyTorch, passes these budgets, or after WORKER_MAX_JOBS
+    # jobs. 0 disables a limit.
+    WORKER_MAX_RSS_MB: int = 3072
+    WORKER_MAX_CUDA_RESERVED_MB: int = 0
+    WORKER_MAX_JOBS: int = 0
+
+    # Note export (GET /notes/export): rows fetched per database round trip, and the
+    # gzip level when compression is requested (1 is fastest)
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_GZIP_LEVEL: int = 1
+
+    # Cache of finished (DONE/FAILED) note responses (app/core/cache.py): entries in each
+    # API process's LRU and for how long, and the TTL of the shared Redis tier (0 disables it)
+    NOTE_CACHE_SIZE: int = 10000
+    NOTE_CACHE_LOCAL_TTL_SECONDS: float = 60.0
+    NOTE_CACHE_REDIS_TTL_SECONDS: int = 86400
+
+    # Note status streams (GET /notes/{note_id}/events): how often an idle stream sends a
+    # keepalive and re-reads the note, in case a status change was not published
+    NOTE_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Port on which the autoscaler and the dispatcher serve their Prometheus metrics
+    # (the API serves /metrics itself); 0 disables it
+    METRICS_PORT: int = 9100
+
+    # Capture a full cProfile of 1 in N summarization jobs (0 disables profiling)
+    PROFILE_SAMPLE_RATE: int = 0
+
     class Config:
         #env_file = ".env"  # <--- BU SATIRI SİL VEYA YORUM SATIRI YAP!!!
         case_sensitive = True
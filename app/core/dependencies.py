@@ -15,23 +15,13 @@ from app.schemas.token import TokenData
 
 # 1. Veritabanı Oturumu Bağımlılığı (daha önce database.py'deydi, burada olması daha uygun)
 def get_db() -> Generator:
-    # === HATA AYIKLAMA İÇİN BUNU EKLE ===
-    print(">>> get_db fonksiyonu çağrıldı, session oluşturuluyor.")
-    # ====================================
     db = SessionLocal()
     try:
-        # === HATA AYIKLAMA İÇİN BUNU EKLE ===
-        print(">>> Session oluşturuldu, endpoint'e veriliyor (yield).")
-        # ====================================
         yield db
     finally:
-        # === HATA AYIKLAMA İÇİN BUNU EKLE ===
-        print(">>> Endpoint çalışması bitti, session kapatılıyor.")
-        # ====================================
         db.close()
 
 
-
 # 2. OAuth2 Şeması
 # FastAPI'ye token'ın nereden alınacağını söylüyoruz.
 # tokenUrl, token'ı almak için gidilecek endpoint'in adresidir.
@@ -0,0 +1,117 @@
+# app/core/logger.py
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+
+# The id of the request (or of the request that enqueued the current job).
+# It is attached to every log record emitted while it is set.
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via 'extra=' and is logged as a field.
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+
+
+def new_request_id() -> str:
+    """
+    Generates a new request id.
+    """
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> Optional[str]:
+    """
+    Returns the request id bound to the current context, if any.
+    """
+    return request_id_var.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Renders a log record as a single JSON line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "process": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler that captures the request id on the emitting thread and keeps the
+    traceback separate from the message, so the listener can format it as a field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.request_id = request_id_var.get()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def setup_logging(level: Optional[str] = None, log_format: Optional[str] = None) -> None:
+    """
+    Configures the root logger. Records are put on an in-memory queue by the calling
+    thread and written to stdout by a background QueueListener thread, so request
+    handlers never block on stream I/O.
+
+    Safe to call more than once; only the first call has an effect.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if (log_format or settings.LOG_FORMAT).lower() == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s")
+        )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(_ContextQueueHandler(log_queue))
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Flushes queued records and stops the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
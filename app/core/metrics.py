@@ -0,0 +1,262 @@
+# app/core/metrics.py
+import logging
+import os
+import shutil
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Metric Definitions
+# Each container is scraped on its own:
+#   - the API serves /metrics (API, database pool and queue metrics),
+#   - the autoscaler (and the worker processes it supervises) and the dispatcher
+#     serve theirs on METRICS_PORT with start_metrics_server().
+# A container that runs several processes (uvicorn workers, the autoscaler's RQ
+# workers) sets PROMETHEUS_MULTIPROC_DIR: prometheus_client writes every process's
+# samples to files named by PID in that directory, and the scrape aggregates them.
+# The directory must be private to the container (PIDs repeat across containers)
+# and empty when it starts (see clear_multiprocess_dir()).
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+# --- API ---
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Number of HTTP requests currently being served.",
+    multiprocess_mode="livesum",
+)
+NOTE_CACHE_LOOKUPS = Counter(
+    "note_cache_lookups_total",
+    "Finished-note cache lookups by result (local_hit, redis_hit or miss).",
+    ["result"],
+)
+
+# --- Worker ---
+INFERENCE_STAGE_SECONDS = Histogram(
+    "summarizer_inference_stage_seconds",
+    "Time spent in each summarization stage (tokenize, generate, decode).",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+INFERENCE_TOKENS = Histogram(
+    "summarizer_tokens",
+    "Number of tokens per summarization, by direction (input or output).",
+    ["direction"],
+    buckets=(16, 32, 64, 128, 256, 512, 1024, 2048),
+)
+RESULT_WRITE_SECONDS = Histogram(
+    "summarizer_result_write_seconds",
+    "Time taken to write a finished summary to the database.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+JOB_OUTCOMES = Counter(
+    "summarizer_jobs_total",
+    "Summarization jobs by final note status.",
+    ["status"],
+)
+
+SUMMARIES_BY_ENGINE = Counter(
+    "summarizer_summaries_total",
+    "Summaries produced, by engine and by why that engine was used "
+    "(default, requested, model_unavailable or overload).",
+    ["engine", "reason"],
+)
+NOTES_CANCELLED = Counter(
+    "summarizer_notes_cancelled_total",
+    "Notes cancelled or deleted before finishing, by the stage they were in (queued or processing).",
+    ["stage"],
+)
+NOTES_EXPIRED = Counter(
+    "summarizer_notes_expired_total",
+    "Notes that passed their deadline before a worker picked them up.",
+)
+WORKER_COLD_START_SECONDS = Histogram(
+    "summarizer_worker_cold_start_seconds",
+    "Time from worker process start to taking jobs, by phase "
+    "(interpreter, imports, load_tokenizer, load_model, warmup, total).",
+    ["phase"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+WORKER_MEMORY_BYTES = Gauge(
+    "summarizer_worker_memory_bytes",
+    "Worker process memory after its last job, by kind (rss, or cuda_allocated and "
+    "cuda_reserved from the PyTorch allocator).",
+    ["kind"],
+    multiprocess_mode="liveall",
+)
+WORKER_JOB_MEMORY_GROWTH_BYTES = Histogram(
+    "summarizer_worker_job_memory_growth_bytes",
+    "Change in worker RSS over one job (shrinking counts as 0).",
+    buckets=(0, 2**20, 4 * 2**20, 16 * 2**20, 64 * 2**20, 256 * 2**20, 2**30),
+)
+WORKER_RECYCLES = Counter(
+    "summarizer_worker_recycles_total",
+    "Workers that stopped taking jobs to be replaced, by reason (rss, cuda_reserved or max_jobs).",
+    ["reason"],
+)
+
+# --- Outbox dispatcher ---
+OUTBOX_DISPATCHED = Counter(
+    "outbox_dispatched_total",
+    "Outbox rows pushed to the job queue.",
+)
+NOTES_RECONCILED = Counter(
+    "notes_reconciled_total",
+    "Stuck notes handled by the reconciler, by action (requeued or failed).",
+    ["action"],
+)
+NOTES_REPROCESSED = Counter(
+    "notes_reprocessed_total",
+    "Finished notes requeued by an admin reprocessing run.",
+)
+
+# --- Autoscaler ---
+AUTOSCALER_WORKERS = Gauge(
+    "autoscaler_workers",
+    "Worker processes managed by the autoscaler, by state (running, draining, or warming: "
+    "running but not ready for jobs yet).",
+    ["state"],
+    multiprocess_mode="livemax",
+)
+AUTOSCALER_DESIRED_WORKERS = Gauge(
+    "autoscaler_desired_workers",
+    "Worker count the autoscaler is aiming for.",
+    multiprocess_mode="livemax",
+)
+AUTOSCALER_DECISIONS = Counter(
+    "autoscaler_decisions_total",
+    "Scaling actions taken by the autoscaler, by direction and reason.",
+    ["direction", "reason"],
+)
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Scrape-time Collectors
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+class RuntimeCollector:
+    """
+    Reads the database connection pool and the RQ queue when /metrics is scraped.
+    """
+
+    def describe(self):
+        # Without this, registering the collector would call collect() (and hit Redis) at import time.
+        return []
+
+    def collect(self):
+        # Imported lazily so that workers can import this module without side effects.
+        from app.core.database import engine
+        from app.tasks import fair_queue
+        from app.tasks.queue import oldest_job_age, q
+
+        pool = engine.pool
+        pool_metric = GaugeMetricFamily(
+            "db_pool_connections", "Database connection pool usage.", labels=["state"]
+        )
+        for state, reader in (("checked_out", "checkedout"), ("idle", "checkedin"), ("size", "size"), ("overflow", "overflow")):
+            if hasattr(pool, reader):
+                pool_metric.add_metric([state], getattr(pool, reader)())
+        yield pool_metric
+
+        depth = GaugeMetricFamily("rq_queue_depth", "Number of jobs waiting in the queue.", labels=["queue"])
+        backlog = GaugeMetricFamily(
+            "fair_queue_backlog", "Jobs waiting in the per-owner fair queues, not yet released to RQ."
+        )
+        oldest = GaugeMetricFamily(
+            "rq_oldest_job_age_seconds", "Age of the oldest job waiting in the queue.", labels=["queue"]
+        )
+        try:
+            depth.add_metric([q.name], q.count)
+            oldest.add_metric([q.name], oldest_job_age(q))
+            backlog.add_metric([], fair_queue.backlog_size())
+        except Exception as e:  # Redis being down must not break the scrape.
+            logger.warning(f"Could not read queue metrics: {e}")
+        yield depth
+        yield oldest
+        yield backlog
+
+
+_runtime_collector = RuntimeCollector()
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    REGISTRY.register(_runtime_collector)
+
+
+def _multiprocess_registry() -> CollectorRegistry:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Returns the Prometheus exposition payload and its content type.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = _multiprocess_registry()
+        registry.register(_runtime_collector)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def clear_multiprocess_dir() -> None:
+    """
+    Removes the files of other processes from PROMETHEUS_MULTIPROC_DIR, if set. Called
+    once by a container's top-level process when it starts, before any child is
+    spawned, so files left by a previous run (whose PIDs may be reused) are not mixed
+    into the new samples. This process's own files, opened when the metrics above were
+    defined, are kept.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory or not os.path.isdir(directory):
+        return
+    own_suffix = f"_{os.getpid()}.db"
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif not name.endswith(own_suffix):
+            os.remove(path)
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """
+    Removes the live gauge files of a process (default: this one) that exited or is
+    exiting. No-op outside multiprocess mode.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def start_metrics_server(port: Optional[int] = None) -> None:
+    """
+    Serves this process's metrics (aggregated over PROMETHEUS_MULTIPROC_DIR when set)
+    on 'port' (default METRICS_PORT) in a background thread. For processes that do not
+    serve HTTP themselves; a port of 0 disables it.
+    """
+    port = settings.METRICS_PORT if port is None else port
+    if not port:
+        return
+    registry = _multiprocess_registry() if "PROMETHEUS_MULTIPROC_DIR" in os.environ else REGISTRY
+    start_http_server(port, registry=registry)
+    logger.info(f"Serving metrics on port {port}.")
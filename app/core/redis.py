@@ -0,0 +1,76 @@
+# app/core/redis.py
+"""
+The Redis clients shared by the API, the workers, the dispatcher and the autoscaler.
+
+Every process uses one synchronous client (redis_client, also the RQ queue's
+connection) and, in async code, one redis.asyncio client (get_async_redis()). Both
+draw from a BlockingConnectionPool of at most REDIS_MAX_CONNECTIONS connections:
+under a burst of requests, callers wait up to REDIS_POOL_TIMEOUT_SECONDS for a free
+connection instead of each opening a new one. Connections time out on connect and
+on reads, and idle ones are PINGed before use after REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+so a connection dropped by Redis or a load balancer is replaced rather than failing
+a request.
+
+RQ workers raise the socket timeout of the pool they are given above their blocking
+dequeue timeout, so the read timeout only applies as configured in other processes.
+"""
+from typing import Any, Dict, Optional
+
+import redis.asyncio as aioredis
+from redis import BlockingConnectionPool, Redis
+
+from app.core.config import settings
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT_SECONDS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+        "socket_keepalive": True,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+    }
+
+
+def create_client(url: Optional[str] = None) -> Redis:
+    """
+    A synchronous client with its own connection pool, configured from the settings.
+    Note: decode_responses=True is NOT used, as RQ expects bytes.
+    """
+    return Redis(connection_pool=BlockingConnectionPool.from_url(url or settings.REDIS_URL, **_pool_options()))
+
+
+def create_async_client(url: Optional[str] = None) -> aioredis.Redis:
+    """
+    An asyncio client with its own connection pool, configured from the settings.
+    """
+    return aioredis.Redis(
+        connection_pool=aioredis.BlockingConnectionPool.from_url(url or settings.REDIS_URL, **_pool_options())
+    )
+
+
+redis_client = create_client()
+
+# Created on first use, inside the event loop it will be used from.
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    The process's shared asyncio client.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = create_async_client()
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    """
+    Closes the shared asyncio client and its connections (on API shutdown).
+    """
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
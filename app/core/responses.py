@@ -0,0 +1,181 @@
+# app/core/responses.py
+import csv
+import enum
+import hashlib
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+
+def model_response(
+    adapter: TypeAdapter,
+    obj: Any,
+    *,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Validates 'obj' (e.g. an ORM instance or a list of them) with the given TypeAdapter
+    and serializes it straight to JSON bytes with pydantic-core.
+
+    This skips the dict round trip FastAPI does for 'response_model' (dump to python,
+    jsonable_encoder, json.dumps). The endpoint should still declare 'response_model'
+    so the OpenAPI schema is unchanged.
+    """
+    validated = adapter.validate_python(obj, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(validated),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Conditional GET helpers
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; the database stores UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def version_headers(items: Iterable[Any]) -> Dict[str, str]:
+    """
+    Builds ETag / Last-Modified headers for one or more versioned rows.
+
+    Each item needs 'id', 'status', 'created_at' and 'updated_at' attributes, so both
+    ORM instances and the lightweight rows from crud.note.get_note_version(s) work.
+    The same rows always produce the same ETag.
+    """
+    parts = []
+    last_modified: Optional[datetime] = None
+    for item in items:
+        modified = item.updated_at or item.created_at
+        status_value = getattr(item.status, "value", item.status)
+        parts.append(f"{item.id}:{status_value}:{modified.isoformat() if modified else ''}")
+        if modified is not None:
+            modified = _as_utc(modified)
+            if last_modified is None or modified > last_modified:
+                last_modified = modified
+
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+    headers = {"ETag": f'W/"{digest}"', "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag (RFC 9110, 13.1.2).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def not_modified_response(headers: Mapping[str, str]) -> Response:
+    """
+    An empty 304 response carrying the validator headers.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(headers))
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Streaming export encoders
+# Each takes an iterator of rows and yields the encoded body in chunks of about
+# EXPORT_CHUNK_BYTES, so a response of any size is built with constant memory.
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return _as_utc(value).isoformat()
+    return value
+
+
+def _chunked(lines: Iterator[str]) -> Iterator[bytes]:
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def ndjson_stream(rows: Iterable[Sequence[Any]], columns: Sequence[str]) -> Iterator[bytes]:
+    """
+    Encodes rows as newline-delimited JSON objects keyed by 'columns'.
+    """
+    def lines():
+        for row in rows:
+            record = {column: _plain(value) for column, value in zip(columns, row)}
+            yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    return _chunked(lines())
+
+
+# Spreadsheet tools evaluate cells starting with these as formulas.
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(rows: Iterable[Sequence[Any]], columns: Sequence[str]) -> Iterator[bytes]:
+    """
+    Encodes rows as CSV with a header line. Nested values (dicts, lists) are written
+    as JSON and None as an empty field. Text that a spreadsheet would run as a formula
+    (starting with =, +, -, @, a tab or a carriage return) is prefixed with a quote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values: Sequence[Any]) -> str:
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    def lines():
+        yield line(columns)
+        for row in rows:
+            yield line([_csv_cell(value) for value in row])
+    return _chunked(lines())
+
+
+def gzip_stream(chunks: Iterable[bytes], *, level: int = 6) -> Iterator[bytes]:
+    """
+    Compresses a byte stream into a gzip file on the fly.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,16 +1,26 @@
 # app/core/security.py
 
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, Optional, TypeVar, Union
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 # 1. Şifre Yönetimi
 # Hangi hashing algoritmasını kullanacağımızı belirtiyoruz. Bcrypt endüstri standardıdır.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 ALGORITHM = settings.ALGORITHM
 SECRET_KEY = settings.SECRET_KEY
@@ -42,4 +52,107 @@ def get_password_hash(password: str) -> str:
     """
     Verilen düz metin şifreyi hash'ler.
     """
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Password Hashing Executor
+# Bcrypt is CPU-bound; running it inline holds a threadpool thread (and the GIL)
+# for the whole cost factor. Endpoints use the async variants below, which run
+# the work in a bounded process pool and reject new work with 503 once the
+# number of pending operations reaches PASSWORD_HASH_MAX_PENDING.
+# If a child process dies (e.g. OOM-killed), the pool is broken for good; it is
+# then replaced and the operation retried once.
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_pending = 0
+
+
+def start_password_executor() -> ProcessPoolExecutor:
+    """
+    Starts the password hashing process pool if it is not running yet.
+
+    Called from the application lifespan so the worker processes are started
+    before the server starts handling requests.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        # Never 'fork': the API process already runs threads (the threadpool, Redis
+        # clients), and a forked child inherits their locks in whatever state they are.
+        # A forkserver imports this module once and forks the children from itself;
+        # where it is unavailable (Windows), children are spawned.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("forkserver")
+            mp_context.set_forkserver_preload([__name__])
+        else:
+            mp_context = multiprocessing.get_context("spawn")
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=mp_context
+        )
+        # Launch the worker processes now rather than on the first login.
+        _hash_executor.submit(abs, 0).result()
+    return _hash_executor
+
+
+def shutdown_password_executor() -> None:
+    """
+    Stops the password hashing process pool.
+    """
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+
+def _discard_broken_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Drops a broken pool so the next start_password_executor() call creates a new one.
+    Only the first caller seeing a given broken pool discards it.
+    """
+    global _hash_executor
+    if _hash_executor is executor:
+        logger.error("A password hashing process died; restarting the pool.")
+        _hash_executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _service_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy. Please try again shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _run_in_hash_pool(func: Callable[..., T], *args: Any) -> T:
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise _service_busy()
+
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            executor = start_password_executor()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                _discard_broken_executor(executor)
+        raise _service_busy()
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Same as verify_password, but runs on the password hashing process pool.
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Same as get_password_hash, but runs on the password hashing process pool.
+    """
+    return await _run_in_hash_pool(get_password_hash, password)
@@ -1,10 +1,13 @@
 # app/crud/note.py
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, func, insert, or_, select, update
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteUpdate # Direct, explicit imports
+from app.models.note import Note, NoteOutbox, NoteProfile, NoteStatus, SummaryEngine
+from app.models.user import User, UserRole
+from app.schemas.note import NoteCreate, NoteReprocessRequest, NoteUpdate # Direct, explicit imports
 
 def get_note(db: Session, *, note_id: int) -> Optional[Note]:
     """
@@ -13,6 +16,32 @@ def get_note(db: Session, *, note_id: int) -> Optional[Note]:
     return db.query(Note).filter(Note.id == note_id).first()
 
 
+def get_note_version(db: Session, *, note_id: int) -> Optional[Any]:
+    """
+    Retrieves only the columns that identify a note's current version
+    (id, owner_id, status, created_at, updated_at), without loading raw_text or the owner.
+    Used for cheap conditional GET checks.
+    """
+    return (
+        db.query(Note.id, Note.owner_id, Note.status, Note.created_at, Note.updated_at)
+        .filter(Note.id == note_id)
+        .first()
+    )
+
+
+def get_note_versions(
+    db: Session, *, owner_id: Optional[int] = None, skip: int = 0, limit: int = 100
+) -> List[Any]:
+    """
+    Retrieves the version columns of a page of notes, using the same filtering and
+    ordering as get_notes_by_user (owner_id given) or get_all_notes (owner_id is None).
+    """
+    query = db.query(Note.id, Note.owner_id, Note.status, Note.created_at, Note.updated_at)
+    if owner_id is not None:
+        query = query.filter(Note.owner_id == owner_id)
+    return query.order_by(Note.created_at.desc()).offset(skip).limit(limit).all()
+
+
 def get_notes_by_user(
     db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
 ) -> List[Note]:
@@ -29,6 +58,17 @@ def get_notes_by_user(
     )
 
 
+def count_pending_notes_by_user(db: Session, *, owner_id: int) -> int:
+    """
+    Counts a user's notes that are still waiting for or undergoing summarization.
+    """
+    return (
+        db.query(Note)
+        .filter(Note.owner_id == owner_id, Note.status.in_([NoteStatus.QUEUED, NoteStatus.PROCESSING]))
+        .count()
+    )
+
+
 def get_all_notes(db: Session, *, skip: int = 0, limit: int = 100) -> List[Note]:
     """
     Retrieves a list of all notes in the system, with pagination. (For admins)
@@ -42,17 +82,193 @@ def get_all_notes(db: Session, *, skip: int = 0, limit: int = 100) -> List[Note]
     )
 
 
-def create_note(db: Session, *, note_in: NoteCreate, owner_id: int) -> Note:
+# Columns of a note export, in order (see stream_notes_for_export).
+EXPORT_COLUMNS = (
+    "id", "owner_id", "owner_email", "status", "engine", "created_at", "updated_at", "expires_at",
+    "processing_time_ms", "failure_reason", "stage_timings", "summary", "raw_text",
+)
+
+
+def stream_notes_for_export(
+    db: Session,
+    *,
+    owner_id: Optional[int] = None,
+    status: Optional[NoteStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> Iterator[Any]:
+    """
+    Yields notes matching the filters as plain rows with the EXPORT_COLUMNS, in id order.
+
+    Rows are fetched 'batch_size' at a time from a server-side cursor and are not ORM
+    instances, so memory stays flat however many notes match. The session must stay
+    open until the iterator is exhausted.
+    """
+    stmt = (
+        select(
+            Note.id, Note.owner_id, User.email.label("owner_email"), Note.status, Note.engine,
+            Note.created_at, Note.updated_at, Note.expires_at, Note.processing_time_ms,
+            Note.failure_reason, Note.stage_timings, Note.summary, Note.raw_text,
+        )
+        .join(User, User.id == Note.owner_id)
+        .order_by(Note.id)
+    )
+    if owner_id is not None:
+        stmt = stmt.where(Note.owner_id == owner_id)
+    if status is not None:
+        stmt = stmt.where(Note.status == status)
+    if created_from is not None:
+        stmt = stmt.where(Note.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Note.created_at < created_to)
+    yield from db.execute(stmt.execution_options(yield_per=batch_size))
+
+
+def create_note(
+    db: Session, *, note_in: NoteCreate, owner_id: int, weight: int = 1, request_id: Optional[str] = None
+) -> Note:
+    """
+    Creates a new note for a specific user, together with the outbox row that gets it
+    summarized. Both are committed in one transaction, so a note can never exist
+    without a pending job (see app/tasks/dispatcher.py). A deadline_seconds in the
+    request becomes the note's expires_at.
+    """
+    expires_at = None
+    if note_in.deadline_seconds:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=note_in.deadline_seconds)
+    db_note = Note(**note_in.dict(exclude={"deadline_seconds", "engine"}), owner_id=owner_id, expires_at=expires_at)
+    db.add(db_note)
+    db.flush()
+    db.add(NoteOutbox(note_id=db_note.id, owner_id=owner_id, weight=weight, request_id=request_id))
+    db.commit()
+    db.refresh(db_note)
+    return db_note
+
+
+def create_summarized_note(
+    db: Session,
+    *,
+    note_in: NoteCreate,
+    owner_id: int,
+    summary: str,
+    engine: SummaryEngine,
+    processing_time_ms: float,
+) -> Note:
+    """
+    Creates a note that was summarized synchronously: it is stored as DONE and no job is queued.
+    """
+    db_note = Note(
+        **note_in.dict(exclude={"deadline_seconds", "engine"}),
+        owner_id=owner_id,
+        status=NoteStatus.DONE,
+        summary=summary,
+        engine=engine,
+        processing_time_ms=processing_time_ms,
+    )
+    db.add(db_note)
+    db.commit()
+    db.refresh(db_note)
+    return db_note
+
+
+def requeue_note(db: Session, *, db_note: Note, weight: int = 1) -> Note:
     """
-    Creates a new note for a specific user.
+    Puts a note back to QUEUED and writes a new outbox row for it, in one transaction.
     """
-    db_note = Note(**note_in.dict(), owner_id=owner_id)
+    db_note.status = NoteStatus.QUEUED
+    db_note.job_id = None
     db.add(db_note)
+    db.add(NoteOutbox(note_id=db_note.id, owner_id=db_note.owner_id, weight=weight))
     db.commit()
     db.refresh(db_note)
     return db_note
 
 
+def claim_note(db: Session, *, note_id: int) -> bool:
+    """
+    Atomically moves a note from QUEUED to PROCESSING. Returns False if the note is gone,
+    already claimed, cancelled or past its deadline, so a job delivered twice never
+    summarizes the same note twice.
+    """
+    claimed = (
+        db.query(Note)
+        .filter(
+            Note.id == note_id,
+            Note.status == NoteStatus.QUEUED,
+            or_(Note.expires_at.is_(None), Note.expires_at > datetime.now(timezone.utc)),
+        )
+        .update({"status": NoteStatus.PROCESSING}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def cancel_note(db: Session, *, note_id: int) -> bool:
+    """
+    Atomically marks a QUEUED or PROCESSING note as CANCELLED and drops its pending
+    outbox rows. Returns False if the note had already finished (or does not exist).
+    """
+    cancelled = (
+        db.query(Note)
+        .filter(Note.id == note_id, Note.status.in_([NoteStatus.QUEUED, NoteStatus.PROCESSING]))
+        .update({"status": NoteStatus.CANCELLED}, synchronize_session=False)
+    )
+    if cancelled:
+        db.query(NoteOutbox).filter(NoteOutbox.note_id == note_id).delete(synchronize_session=False)
+    db.commit()
+    return cancelled == 1
+
+
+def expire_note(db: Session, *, note_id: int) -> bool:
+    """
+    Marks a note EXPIRED if it is still QUEUED and past its deadline.
+    """
+    expired = (
+        db.query(Note)
+        .filter(
+            Note.id == note_id,
+            Note.status == NoteStatus.QUEUED,
+            Note.expires_at <= datetime.now(timezone.utc),
+        )
+        .update({"status": NoteStatus.EXPIRED}, synchronize_session=False)
+    )
+    db.commit()
+    return expired == 1
+
+
+def expire_overdue_notes(db: Session) -> int:
+    """
+    Marks every QUEUED note past its deadline as EXPIRED and drops their outbox rows.
+    Returns the number of notes expired.
+    """
+    now = datetime.now(timezone.utc)
+    overdue = (Note.status == NoteStatus.QUEUED, Note.expires_at <= now)
+    db.query(NoteOutbox).filter(
+        NoteOutbox.note_id.in_(db.query(Note.id).filter(*overdue).scalar_subquery())
+    ).delete(synchronize_session=False)
+    expired = db.query(Note).filter(*overdue).update({"status": NoteStatus.EXPIRED}, synchronize_session=False)
+    db.commit()
+    return expired
+
+
+def finish_note(db: Session, *, note_id: int, values: Dict[str, Any]) -> Optional[Note]:
+    """
+    Atomically writes a final state (status and result fields) of a note that is still
+    PROCESSING. Returns the updated note, or None if it was cancelled or deleted in the
+    meantime, in which case nothing is written.
+    """
+    finished = (
+        db.query(Note)
+        .filter(Note.id == note_id, Note.status == NoteStatus.PROCESSING)
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    if finished != 1:
+        return None
+    return get_note(db, note_id=note_id)
+
+
 def update_note(
     db: Session, *, db_note: Note, note_in: NoteUpdate | dict
 ) -> Note:
@@ -82,4 +298,154 @@ def delete_note(db: Session, *, note_id: int) -> Optional[Note]:
     if note_to_delete:
         db.delete(note_to_delete)
         db.commit()
-    return note_to_delete
\ No newline at end of file
+    return note_to_delete
+
+
+def create_note_profile(db: Session, *, note_id: int, data: bytes) -> NoteProfile:
+    """
+    Stores (or replaces) the sampled profile of a note's summarization job.
+    """
+    db.query(NoteProfile).filter(NoteProfile.note_id == note_id).delete()
+    db_profile = NoteProfile(note_id=note_id, data=data)
+    db.add(db_profile)
+    db.commit()
+    return db_profile
+
+
+def get_note_profile(db: Session, *, note_id: int) -> Optional[NoteProfile]:
+    """
+    Retrieves the sampled profile of a note, if one was captured.
+    """
+    return db.query(NoteProfile).filter(NoteProfile.note_id == note_id).first()
+
+
+def get_outbox_batch(db: Session, *, limit: int = 100) -> List[NoteOutbox]:
+    """
+    Locks and returns the oldest pending outbox rows. Rows locked by another
+    dispatcher are skipped (FOR UPDATE SKIP LOCKED), so dispatchers can run in parallel.
+    The locks are held until the caller commits.
+    """
+    return (
+        db.query(NoteOutbox)
+        .order_by(NoteOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def mark_outbox_dispatched(db: Session, *, dispatched: List[Tuple[NoteOutbox, str]]) -> None:
+    """
+    Deletes dispatched outbox rows and records each note's new job id, in one transaction.
+    """
+    notes = Note.__table__
+    db.execute(
+        update(notes)
+        .where(notes.c.id == bindparam("b_note_id"))
+        .values(job_id=bindparam("b_job_id"), enqueue_attempts=notes.c.enqueue_attempts + 1),
+        [{"b_note_id": row.note_id, "b_job_id": job_id} for row, job_id in dispatched],
+    )
+    db.query(NoteOutbox).filter(NoteOutbox.id.in_([row.id for row, _ in dispatched])).delete()
+    db.commit()
+
+
+def get_stuck_notes(db: Session, *, updated_before: datetime, limit: int = 100) -> List[Note]:
+    """
+    Retrieves QUEUED or PROCESSING notes that have not changed since 'updated_before'
+    and have no pending outbox row.
+    """
+    pending = db.query(NoteOutbox.id).filter(NoteOutbox.note_id == Note.id).exists()
+    return (
+        db.query(Note)
+        .filter(
+            Note.status.in_([NoteStatus.QUEUED, NoteStatus.PROCESSING]),
+            func.coalesce(Note.updated_at, Note.created_at) < updated_before,
+            ~pending,
+        )
+        .order_by(Note.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def fail_stuck_note(db: Session, *, note_id: int, updated_before: datetime, failure_reason: str) -> bool:
+    """
+    Marks a note FAILED if it is still QUEUED or PROCESSING and has not changed since
+    'updated_before'. Returns False if a worker (or the API) changed it in the meantime,
+    in which case nothing is written.
+    """
+    failed = (
+        db.query(Note)
+        .filter(
+            Note.id == note_id,
+            Note.status.in_([NoteStatus.QUEUED, NoteStatus.PROCESSING]),
+            func.coalesce(Note.updated_at, Note.created_at) < updated_before,
+        )
+        .update({"status": NoteStatus.FAILED, "failure_reason": failure_reason}, synchronize_session=False)
+    )
+    db.commit()
+    return failed == 1
+
+
+def _reprocess_filters(criteria: NoteReprocessRequest) -> List[Any]:
+    filters = [Note.status.in_(criteria.statuses)]
+    if criteria.failure_reason_contains:
+        filters.append(Note.failure_reason.contains(criteria.failure_reason_contains, autoescape=True))
+    if criteria.engine is not None:
+        filters.append(Note.engine == criteria.engine)
+    if criteria.owner_id is not None:
+        filters.append(Note.owner_id == criteria.owner_id)
+    if criteria.created_from is not None:
+        filters.append(Note.created_at >= criteria.created_from)
+    if criteria.created_to is not None:
+        filters.append(Note.created_at < criteria.created_to)
+    if criteria.after_id is not None:
+        filters.append(Note.id > criteria.after_id)
+    return filters
+
+
+def count_reprocessable_notes(db: Session, *, criteria: NoteReprocessRequest) -> int:
+    """
+    Counts the notes matching a reprocessing selection.
+    """
+    return db.query(func.count(Note.id)).filter(*_reprocess_filters(criteria)).scalar()
+
+
+def requeue_notes_batch(
+    db: Session,
+    *,
+    criteria: NoteReprocessRequest,
+    limit: int,
+    weights: Dict[UserRole, int],
+    request_id: Optional[str] = None,
+) -> List[int]:
+    """
+    Resets up to 'limit' notes matching the selection to QUEUED with one bulk UPDATE
+    and writes their outbox rows, in one transaction. Returns the ids of the notes requeued.
+
+    A requeued note no longer matches (only finished notes can be selected), so calling
+    this until it returns less than 'limit' walks through the whole selection, and a
+    run that is interrupted and started again does not queue any note twice. Rows
+    locked by a concurrent run are skipped.
+    """
+    notes = Note.__table__
+    filters = _reprocess_filters(criteria)
+    batch = select(Note.id).where(*filters).order_by(Note.id).limit(limit).with_for_update(skip_locked=True)
+    requeued = db.execute(
+        update(notes)
+        .where(notes.c.id.in_(batch.scalar_subquery()), *filters)
+        .values(
+            status=NoteStatus.QUEUED, failure_reason=None, job_id=None, enqueue_attempts=0, expires_at=None,
+            summary=None, engine=None, processing_time_ms=None, stage_timings=None,
+        )
+        .returning(notes.c.id, notes.c.owner_id)
+    ).all()
+    if requeued:
+        owner_ids = {owner_id for _, owner_id in requeued}
+        roles = dict(db.query(User.id, User.role).filter(User.id.in_(owner_ids)).all())
+        db.execute(insert(NoteOutbox), [
+            {"note_id": note_id, "owner_id": owner_id, "weight": weights.get(roles.get(owner_id), 1), "request_id": request_id}
+            for note_id, owner_id in requeued
+        ])
+    db.commit()
+    return [note_id for note_id, _ in requeued]
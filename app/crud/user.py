@@ -20,6 +20,15 @@ def get_user_by_email(db: Session, *, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
+def get_users_by_ids(db: Session, *, user_ids: List[int]) -> List[User]:
+    """
+    Retrieves the users with the given IDs.
+    """
+    if not user_ids:
+        return []
+    return db.query(User).filter(User.id.in_(user_ids)).all()
+
+
 def get_users(db: Session, *, skip: int = 0, limit: int = 100) -> List[User]:
     """
     Retrieves a list of users, with pagination.
@@ -27,11 +36,13 @@ def get_users(db: Session, *, skip: int = 0, limit: int = 100) -> List[User]:
     return db.query(User).offset(skip).limit(limit).all()
 
 
-def create_user(db: Session, *, user_in: UserCreate) -> User:
+def create_user(db: Session, *, user_in: UserCreate, hashed_password: Optional[str] = None) -> User:
     """
     Creates a new user in the database.
+    If hashed_password is given (e.g. computed off the request thread), it is used as-is.
     """
-    hashed_password = get_password_hash(user_in.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_in.password)
     db_user = User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -1,14 +1,43 @@
 # app/main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from app.core.config import settings
+from app.core import security
+from app.core.logger import setup_logging
+from app.core.metrics import mark_process_dead, render_metrics
+from app.core.middleware import MetricsMiddleware, RequestIdMiddleware
+from app.core.redis import close_async_redis
 from app.api import api_router
+from app.tasks import note_events
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fork the password hashing pool before any request is served.
+    security.start_password_executor()
+    # Note events and note cache invalidations share one Redis subscription.
+    note_events.hub.start()
+    yield
+    await note_events.hub.close()
+    await close_async_redis()
+    security.shutdown_password_executor()
+    # uvicorn --reload (and multiple workers) replace processes; drop this one's live gauges.
+    mark_process_dead()
+
 
 # Initialize the FastAPI application
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
 # Include the main API router
 # All routes from api_router will be prefixed with /api/v1
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -19,4 +48,15 @@ def read_root():
     """
     Root endpoint to check if the API is running.
     """
-    return {"message": f"Welcome to {settings.PROJECT_NAME}"}
\ No newline at end of file
+    return {"message": f"Welcome to {settings.PROJECT_NAME}"}
+
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint: API, database pool and queue metrics. The workers and the
+    dispatcher are scraped separately (see app/core/metrics.py).
+    """
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
@@ -9,6 +9,8 @@ from sqlalchemy import (
     Enum,
     String,
     Float,
+    JSON,
+    LargeBinary,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -24,6 +26,16 @@ class NoteStatus(str, enum.Enum):
     PROCESSING = "PROCESSING"
     DONE = "DONE"
     FAILED = "FAILED"
+    CANCELLED = "CANCELLED"  # Cancelled or deleted by the user before finishing
+    EXPIRED = "EXPIRED"      # Not picked up by a worker before its deadline
+
+
+class SummaryEngine(str, enum.Enum):
+    """
+    Enum for the engines that can produce a summary.
+    """
+    ABSTRACTIVE = "ABSTRACTIVE"  # T5 beam search on a worker
+    EXTRACTIVE = "EXTRACTIVE"    # TextRank sentence selection (app/tasks/extractive.py)
 
 
 class Note(Base):
@@ -39,6 +51,14 @@ class Note(Base):
     status = Column(Enum(NoteStatus), default=NoteStatus.QUEUED, nullable=False, index=True)
     processing_time_ms = Column(Float, nullable=True)  # Time taken by the AI model in ms
     failure_reason = Column(String(512), nullable=True) # Stores error messages on failure
+    engine = Column(Enum(SummaryEngine), nullable=True)  # Engine that produced the summary
+    # Per-stage timings in ms (queue wait, DB claim, tokenize, encoder, decoder, ...), see summarize_task
+    stage_timings = Column(JSON, nullable=True)
+    # The RQ job currently responsible for the note and how many jobs were dispatched for it
+    job_id = Column(String(64), nullable=True)
+    enqueue_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # Optional deadline given at submission; a note still QUEUED after it becomes EXPIRED
+    expires_at = Column(DateTime(timezone=True), nullable=True)
 
     # Timestamps and Ownership
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -47,4 +67,34 @@ class Note(Base):
 
     # SQLAlchemy Relationship
     # Establishes a bidirectional relationship with the User model.
-    owner = relationship("User", back_populates="notes")
\ No newline at end of file
+    owner = relationship("User", back_populates="notes")
+
+
+class NoteProfile(Base):
+    """
+    A full cProfile capture of one summarization job, stored for sampled jobs only.
+    The 'data' column holds a marshalled pstats dump (the format of a .prof file).
+    """
+    __tablename__ = "note_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False, unique=True)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class NoteOutbox(Base):
+    """
+    A pending summarization job, written in the same transaction as its note.
+    The dispatcher (app/tasks/dispatcher.py) pushes these to Redis and deletes them.
+    """
+    __tablename__ = "note_outbox"
+    # Ids are part of the job ids (see dispatcher.outbox_job_id), so SQLite must not reuse them.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_id = Column(Integer, nullable=False)
+    weight = Column(Integer, nullable=False, default=1)  # Fair-queue weight of the owner
+    request_id = Column(String(64), nullable=True)  # Correlates the worker's logs with the API request
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
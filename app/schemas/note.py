@@ -1,9 +1,9 @@
 # app/schemas/note.py
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field, EmailStr
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, EmailStr, field_validator
 
-from app.models.note import NoteStatus
+from app.models.note import NoteStatus, SummaryEngine
 
 
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
@@ -36,6 +36,16 @@ class NoteCreate(BaseModel):
         max_length=5000,
         description="Text to be summarized. Must be between 50 and 5000 characters."
     )
+    deadline_seconds: Optional[int] = Field(
+        None,
+        gt=0,
+        le=86400,
+        description="If set, the note expires (and is never summarized) unless a worker picks it up within this many seconds."
+    )
+    engine: SummaryEngine = Field(
+        SummaryEngine.ABSTRACTIVE,
+        description="'ABSTRACTIVE' queues the note for the T5 model. 'EXTRACTIVE' picks key sentences and returns the note already 'DONE'."
+    )
 
 
 class NoteUpdate(BaseModel):
@@ -47,6 +57,42 @@ class NoteUpdate(BaseModel):
     status: Optional[NoteStatus] = Field(None, description="New status for the note.")
 
 
+# Notes in these states are finished and can be summarized again.
+REPROCESSABLE_STATUSES = (NoteStatus.FAILED, NoteStatus.EXPIRED, NoteStatus.CANCELLED, NoteStatus.DONE)
+
+
+class NoteReprocessRequest(BaseModel):
+    """
+    Schema for selecting finished notes to summarize again (POST /admin/notes/reprocess).
+    """
+    statuses: List[NoteStatus] = Field(
+        [NoteStatus.FAILED],
+        min_length=1,
+        description="Statuses to select. Only finished notes (FAILED, EXPIRED, CANCELLED, DONE) can be reprocessed."
+    )
+    failure_reason_contains: Optional[str] = Field(None, description="Only notes whose failure reason contains this text.")
+    engine: Optional[SummaryEngine] = Field(None, description="Only notes summarized by this engine, e.g. 'EXTRACTIVE' fallbacks.")
+    owner_id: Optional[int] = Field(None, description="Only notes of this owner.")
+    created_from: Optional[datetime] = Field(None, description="Only notes created at or after this time.")
+    created_to: Optional[datetime] = Field(None, description="Only notes created before this time.")
+    after_id: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Only notes with a higher id: the 'next_after_id' of the previous call, to continue a run."
+    )
+    limit: Optional[int] = Field(None, gt=0, description="Reprocess at most this many notes.")
+    dry_run: bool = Field(False, description="Only count the matching notes.")
+
+    @field_validator("statuses")
+    @classmethod
+    def only_finished_statuses(cls, statuses: List[NoteStatus]) -> List[NoteStatus]:
+        unfinished = [status.value for status in statuses if status not in REPROCESSABLE_STATUSES]
+        if unfinished:
+            # QUEUED/PROCESSING notes already have a job; stuck ones are handled by the reconciler.
+            raise ValueError(f"Notes in {', '.join(unfinished)} cannot be reprocessed.")
+        return statuses
+
+
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # Schemas for API Response Bodies
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
@@ -61,8 +107,25 @@ class NotePublic(BaseModel):
     summary: Optional[str] = Field(None, description="The generated summary. Null if not 'DONE'.")
     failure_reason: Optional[str] = Field(None, description="Reason for failure. Null if not 'FAILED'.")
     processing_time_ms: Optional[float] = Field(None, description="Time taken for summarization in milliseconds.")
+    engine: Optional[SummaryEngine] = Field(None, description="Engine that produced the summary. Workers fall back to 'EXTRACTIVE' when overloaded.")
+    stage_timings: Optional[Dict[str, float]] = Field(None, description="Per-stage timings in milliseconds (queue wait, tokenize, encoder, decoder, ...).")
     created_at: datetime = Field(description="Timestamp when the note was created.")
+    expires_at: Optional[datetime] = Field(None, description="Deadline for a worker to pick the note up. Null if none was given.")
     owner: NoteOwnerPublic = Field(description="The user who created the note.")
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class NoteReprocessResult(BaseModel):
+    """
+    Outcome of a reprocessing run.
+    """
+    matched: int = Field(description="Notes matching the selection when the run started.")
+    requeued: int = Field(description="Notes reset to 'QUEUED' and handed to the dispatcher.")
+    batches: int = Field(description="Number of batches the notes were requeued in.")
+    dry_run: bool
+    next_after_id: Optional[int] = Field(
+        None,
+        description="Set when matching notes are left: repeat the request with this 'after_id' to continue."
+    )
@@ -0,0 +1,21 @@
+# app/schemas/queue.py
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class OwnerBacklog(BaseModel):
+    """
+    Jobs waiting in one owner's fair-queue sub-queue.
+    """
+    owner_id: int
+    email: Optional[str] = None
+    queued: int = Field(description="Jobs waiting in this owner's sub-queue.")
+
+
+class QueueStatus(BaseModel):
+    """
+    Snapshot of the summarization queue for admins.
+    """
+    ready: int = Field(description="Jobs released to the RQ queue and waiting for a worker.")
+    backlog: int = Field(description="Jobs waiting in the per-owner fair queues.")
+    owners: List[OwnerBacklog] = Field(description="Per-owner backlog, largest first.")
@@ -0,0 +1,132 @@
+# app/tasks/admission.py
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import note as crud_note
+from app.models.user import User
+from app.tasks.fair_queue import SIZE_KEY
+from app.tasks.queue import q
+
+logger = logging.getLogger(__name__)
+
+# Workers INCR one counter per minute (epoch minute in the key) for every finished job.
+COMPLETIONS_KEY_PREFIX = "summarizer:completed:"
+
+
+@dataclass
+class QueueState:
+    """
+    A snapshot of the summarization backlog.
+    """
+    depth: int
+    jobs_per_second: float
+
+    @property
+    def estimated_wait_seconds(self) -> float:
+        if self.depth == 0:
+            return 0.0
+        if self.jobs_per_second > 0:
+            return self.depth / self.jobs_per_second
+        # No recent completions (idle workers or a cold start): fall back to a fixed cost per job.
+        return self.depth * settings.ADMISSION_FALLBACK_SECONDS_PER_JOB
+
+    def seconds_to_drain(self, jobs: float) -> int:
+        """
+        Seconds until 'jobs' jobs have been processed at the current rate, rounded up (at least 1).
+        """
+        rate = self.jobs_per_second or 1 / settings.ADMISSION_FALLBACK_SECONDS_PER_JOB
+        return max(1, math.ceil(jobs / rate))
+
+
+def record_completion() -> None:
+    """
+    Counts a finished job towards the recent worker throughput. Called by the worker.
+    """
+    minute = int(time.time() // 60)
+    key = f"{COMPLETIONS_KEY_PREFIX}{minute}"
+    pipe = q.connection.pipeline(transaction=False)
+    pipe.incr(key)
+    pipe.expire(key, (settings.ADMISSION_THROUGHPUT_WINDOW_MINUTES + 1) * 60)
+    pipe.execute()
+
+
+def get_queue_state() -> QueueState:
+    """
+    Reads the queue depth (jobs ready in RQ plus the owners' fair-queue backlog) and the
+    completions of the last ADMISSION_THROUGHPUT_WINDOW_MINUTES minutes (plus the current
+    one) in a single Redis round trip. The throughput is 0 (unknown) until at least
+    ADMISSION_MIN_COMPLETIONS jobs completed in that window.
+    """
+    now = time.time()
+    current_minute = int(now // 60)
+    window = settings.ADMISSION_THROUGHPUT_WINDOW_MINUTES
+    keys = [f"{COMPLETIONS_KEY_PREFIX}{minute}" for minute in range(current_minute - window, current_minute + 1)]
+
+    pipe = q.connection.pipeline(transaction=False)
+    pipe.llen(q.key)
+    pipe.get(SIZE_KEY)
+    pipe.mget(keys)
+    ready, backlog, counts = pipe.execute()
+
+    depth = int(ready) + int(backlog or 0)
+    completed = sum(int(count) for count in counts if count)
+    if completed < max(1, settings.ADMISSION_MIN_COMPLETIONS):
+        # Too few samples (cold start, or idle workers): a rate measured over the whole
+        # window would be far too low, so estimated_wait_seconds uses the fallback cost per job.
+        return QueueState(depth=depth, jobs_per_second=0.0)
+
+    # Measure from the start of the oldest minute that saw a completion, not the whole
+    # window, so the minutes before workers started do not dilute the rate.
+    first_minute = current_minute - window + next(index for index, count in enumerate(counts) if count)
+    elapsed = max(now - first_minute * 60, 1.0)
+    return QueueState(depth=depth, jobs_per_second=completed / elapsed)
+
+
+def enforce_admission(db: Session, user: User) -> None:
+    """
+    Rejects a new note when accepting it would only grow an unbounded backlog.
+
+    - 503 + Retry-After when the queue is deeper than ADMISSION_MAX_QUEUE_DEPTH, or the
+      estimated wait (depth / recent worker throughput) exceeds ADMISSION_MAX_WAIT_SECONDS.
+    - 429 + Retry-After when the user already has USER_MAX_PENDING_NOTES notes queued or processing.
+
+    If Redis cannot be read the note is admitted; enqueueing will surface the real error.
+    """
+    try:
+        state = get_queue_state()
+    except Exception as e:
+        logger.warning(f"Admission control skipped, could not read queue state: {e}")
+        return
+
+    max_depth = settings.ADMISSION_MAX_QUEUE_DEPTH
+    if max_depth and state.depth >= max_depth:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The summarization queue is full. Please retry later.",
+            headers={"Retry-After": str(state.seconds_to_drain(state.depth - max_depth + 1))},
+        )
+
+    max_wait = settings.ADMISSION_MAX_WAIT_SECONDS
+    wait = state.estimated_wait_seconds
+    if max_wait and wait > max_wait:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"The summarization backlog is too long (estimated wait {wait:.0f}s). Please retry later.",
+            headers={"Retry-After": str(max(1, math.ceil(wait - max_wait)))},
+        )
+
+    max_pending = settings.USER_MAX_PENDING_NOTES
+    if max_pending:
+        pending = crud_note.count_pending_notes_by_user(db, owner_id=user.id)
+        if pending >= max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"You already have {pending} notes waiting for summarization.",
+                headers={"Retry-After": str(state.seconds_to_drain(pending - max_pending + 1))},
+            )
@@ -0,0 +1,246 @@
+# app/tasks/autoscaler.py
+"""
+Supervisor that runs summarization workers and scales them with the load:
+
+    python -m app.tasks.autoscaler
+
+Every AUTOSCALER_INTERVAL_SECONDS it reads the queue (ready jobs plus the fair-queue
+backlog), the age of the oldest waiting job and the host CPU utilisation, and keeps
+between AUTOSCALER_MIN_WORKERS and AUTOSCALER_MAX_WORKERS `app.tasks.worker`
+processes running.
+
+New workers only start taking jobs once they have loaded and warmed up the model;
+until then they are reported as 'warming'.
+
+Workers are retired with a single SIGTERM, which RQ treats as a warm shutdown: the
+worker finishes the job it is running and then exits, so no summary is cut off
+mid-generation. Idle workers are retired first. Workers that retire themselves
+(over their memory or job budget, see app.tasks.worker) are replaced straight away.
+"""
+import logging
+import math
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+from rq import Worker
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logger import setup_logging
+from app.tasks import fair_queue
+from app.tasks.queue import oldest_job_age, q
+from app.tasks.worker import ready_workers
+
+logger = logging.getLogger(__name__)
+
+WORKER_COMMAND = [sys.executable, "-m", "app.tasks.worker"]
+
+
+@dataclass
+class LoadSample:
+    """
+    What the autoscaler saw on one tick.
+    """
+    backlog: int
+    oldest_job_age: float
+    cpu_percent: float
+
+
+def desired_workers(sample: LoadSample, current: int) -> Tuple[int, str]:
+    """
+    Returns the worker count to aim for and the reason behind it.
+
+    One worker per AUTOSCALER_JOBS_PER_WORKER waiting jobs, plus one more whenever
+    the oldest job has waited longer than AUTOSCALER_MAX_JOB_AGE_SECONDS. Scaling up
+    is held back while the CPU is saturated: summarization is CPU-bound, so another
+    worker would only slow the running ones down.
+    """
+    desired = math.ceil(sample.backlog / max(1, settings.AUTOSCALER_JOBS_PER_WORKER))
+    reason = "backlog"
+    if sample.oldest_job_age > settings.AUTOSCALER_MAX_JOB_AGE_SECONDS and desired <= current:
+        desired = current + 1
+        reason = "job_age"
+    desired = max(settings.AUTOSCALER_MIN_WORKERS, min(settings.AUTOSCALER_MAX_WORKERS, desired))
+    if desired > current and sample.cpu_percent >= settings.AUTOSCALER_MAX_CPU_PERCENT:
+        return max(current, settings.AUTOSCALER_MIN_WORKERS), "cpu_saturated"
+    return desired, reason
+
+
+class Autoscaler:
+    """
+    Spawns, drains and reaps worker processes.
+    """
+
+    def __init__(self) -> None:
+        self.running: Dict[int, subprocess.Popen] = {}
+        self.draining: Dict[int, subprocess.Popen] = {}
+        self.last_scale_up = 0.0
+        self.last_scale_down = 0.0
+        self.holding = False
+        self.stopping = False
+
+    # --- Signals ---
+
+    def sample(self) -> LoadSample:
+        pipe = q.connection.pipeline(transaction=False)
+        pipe.llen(q.key)
+        pipe.get(fair_queue.SIZE_KEY)
+        ready, backlog = pipe.execute()
+        return LoadSample(
+            backlog=int(ready) + int(backlog or 0),
+            oldest_job_age=oldest_job_age(q),
+            cpu_percent=psutil.cpu_percent(interval=None),
+        )
+
+    def _idle_pids(self) -> List[int]:
+        idle = []
+        for worker in Worker.all(queue=q):
+            if worker.pid in self.running and worker.get_state() == "idle":
+                idle.append(worker.pid)
+        return idle
+
+    def _warming_pids(self) -> List[int]:
+        # Started but not ready yet: still loading or warming up the model.
+        try:
+            ready = {report["pid"] for report in ready_workers(q.connection)}
+        except Exception as e:
+            logger.warning(f"Could not read worker readiness: {e}")
+            return []
+        return [pid for pid in self.running if pid not in ready]
+
+    # --- Process management ---
+
+    def spawn(self, reason: str) -> None:
+        # A new session keeps a terminal's Ctrl-C away from the workers: a second
+        # signal would turn RQ's warm shutdown into a forced one.
+        process = subprocess.Popen(WORKER_COMMAND, start_new_session=True)
+        self.running[process.pid] = process
+        metrics.AUTOSCALER_DECISIONS.labels(direction="up", reason=reason).inc()
+        logger.info(f"Started worker {process.pid}.", extra={"pid": process.pid, "reason": reason})
+
+    def retire(self, pid: int, reason: str) -> None:
+        process = self.running.pop(pid)
+        process.send_signal(signal.SIGTERM)
+        self.draining[pid] = process
+        metrics.AUTOSCALER_DECISIONS.labels(direction="down", reason=reason).inc()
+        logger.info(f"Draining worker {pid}.", extra={"pid": pid, "reason": reason})
+
+    def reap(self) -> None:
+        for pool in (self.running, self.draining):
+            for pid, process in list(pool.items()):
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+                del pool[pid]
+                metrics.mark_process_dead(pid)
+                if pool is self.running and returncode == 0 and not self.stopping:
+                    # Workers exit cleanly on their own when over their memory or job
+                    # budget; replace them right away rather than waiting for a tick.
+                    logger.info(f"Worker {pid} recycled itself.")
+                    self.spawn("recycled")
+                elif pool is self.running:
+                    logger.warning(f"Worker {pid} exited unexpectedly with code {returncode}.")
+                else:
+                    logger.info(f"Worker {pid} drained and exited.")
+
+    # --- Control loop ---
+
+    def tick(self) -> None:
+        self.reap()
+        current = len(self.running)
+        try:
+            sample = self.sample()
+        except Exception as e:
+            # Without queue data, only keep the minimum running.
+            logger.warning(f"Could not read queue state: {e}")
+            sample = None
+
+        if sample is None:
+            desired, reason = max(current, settings.AUTOSCALER_MIN_WORKERS), "no_data"
+        else:
+            desired, reason = desired_workers(sample, current)
+        metrics.AUTOSCALER_DESIRED_WORKERS.set(desired)
+        holding = reason == "cpu_saturated" and current >= settings.AUTOSCALER_MIN_WORKERS
+        if holding != self.holding:
+            # Log once when scaling up starts being held back, not on every tick.
+            self.holding = holding
+            if holding:
+                self._log_decision("hold", current, current, reason, sample)
+                metrics.AUTOSCALER_DECISIONS.labels(direction="hold", reason=reason).inc()
+
+        now = time.monotonic()
+        if current < settings.AUTOSCALER_MIN_WORKERS:
+            # Replacing crashed workers or starting up: no cooldown.
+            for _ in range(settings.AUTOSCALER_MIN_WORKERS - current):
+                self.spawn("min_workers")
+            self.last_scale_up = now
+        elif desired > current and now - self.last_scale_up >= settings.AUTOSCALER_SCALE_UP_COOLDOWN_SECONDS:
+            self._log_decision("up", current, desired, reason, sample)
+            for _ in range(desired - current):
+                self.spawn(reason)
+            self.last_scale_up = now
+        elif (
+            desired < current
+            and now - self.last_scale_down >= settings.AUTOSCALER_SCALE_DOWN_COOLDOWN_SECONDS
+            and now - self.last_scale_up >= settings.AUTOSCALER_SCALE_DOWN_COOLDOWN_SECONDS
+        ):
+            # Scale down one worker at a time, preferring one that is not running a job.
+            self._log_decision("down", current, current - 1, reason, sample)
+            idle = self._idle_pids()
+            self.retire(idle[0] if idle else next(iter(self.running)), reason)
+            self.last_scale_down = now
+
+        metrics.AUTOSCALER_WORKERS.labels(state="running").set(len(self.running))
+        metrics.AUTOSCALER_WORKERS.labels(state="warming").set(len(self._warming_pids()))
+        metrics.AUTOSCALER_WORKERS.labels(state="draining").set(len(self.draining))
+
+    def _log_decision(self, direction: str, current: int, target: int, reason: str, sample: Optional[LoadSample]) -> None:
+        logger.info(
+            f"Scaling {direction} from {current} to {target} workers ({reason}).",
+            extra={
+                "direction": direction,
+                "current_workers": current,
+                "target_workers": target,
+                "reason": reason,
+                "backlog": sample.backlog if sample else None,
+                "oldest_job_age_s": round(sample.oldest_job_age, 1) if sample else None,
+                "cpu_percent": sample.cpu_percent if sample else None,
+            },
+        )
+
+    def stop(self, *_) -> None:
+        self.stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        psutil.cpu_percent(interval=None)  # The first reading is meaningless; prime it.
+        logger.info(
+            f"Autoscaler started with {settings.AUTOSCALER_MIN_WORKERS}-{settings.AUTOSCALER_MAX_WORKERS} workers."
+        )
+        while not self.stopping:
+            self.tick()
+            time.sleep(settings.AUTOSCALER_INTERVAL_SECONDS)
+
+        logger.info("Autoscaler stopping, draining all workers.")
+        for pid in list(self.running):
+            self.retire(pid, "shutdown")
+        for process in self.draining.values():
+            process.wait()
+        self.reap()
+
+
+def main() -> None:
+    setup_logging()
+    metrics.clear_multiprocess_dir()
+    metrics.start_metrics_server()
+    Autoscaler().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# app/tasks/cancellation.py
+import logging
+from typing import Iterable
+
+from rq.job import JobStatus
+
+from app.models.note import Note
+from app.tasks import fair_queue
+from app.tasks.queue import q
+
+logger = logging.getLogger(__name__)
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Cancellation
+# The database status is the source of truth: workers only claim QUEUED notes, so
+# a CANCELLED note is never started. The Redis side below only saves work: it
+# takes a waiting job out of the queues, and tells a worker that is already
+# generating to stop between decode steps.
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+ABORT_KEY_PREFIX = "summarizer:abort:"
+# Long enough to outlive any job; the flag only matters while the job is running.
+ABORT_FLAG_TTL_SECONDS = 3600
+
+
+def withdraw(note: Note) -> None:
+    """
+    Removes the note's job from the queues and flags it for abort if it is running.
+    Best effort: failures are logged, never raised.
+    """
+    try:
+        q.connection.set(f"{ABORT_KEY_PREFIX}{note.id}", 1, ex=ABORT_FLAG_TTL_SECONDS)
+        if note.job_id and fair_queue.remove(note.job_id, owner_id=note.owner_id):
+            job = q.fetch_job(note.job_id)
+            if job is not None and job.get_status() == JobStatus.QUEUED:
+                job.cancel()
+    except Exception as e:
+        logger.warning(f"Could not withdraw the job of note {note.id}: {e}")
+
+
+def clear_abort(note_ids: Iterable[int]) -> None:
+    """
+    Drops the abort flags of notes that are queued again (e.g. reprocessed after a
+    cancel), so their new job is not aborted. Best effort: failures are logged, never raised.
+    """
+    keys = [f"{ABORT_KEY_PREFIX}{note_id}" for note_id in note_ids]
+    if not keys:
+        return
+    try:
+        q.connection.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Could not clear the abort flags of {len(keys)} notes: {e}")
+
+
+def abort_requested(note_id: int) -> bool:
+    """
+    True if the note was cancelled while its job was running. Called by the worker.
+    """
+    try:
+        return bool(q.connection.exists(f"{ABORT_KEY_PREFIX}{note_id}"))
+    except Exception as e:
+        logger.warning(f"Could not check the abort flag of note {note_id}: {e}")
+        return False
@@ -0,0 +1,205 @@
+# app/tasks/dispatcher.py
+"""
+Outbox dispatcher and stuck-note reconciler:
+
+    python -m app.tasks.dispatcher
+
+The API never talks to Redis when a note is created: create_note commits the note and
+a note_outbox row in one transaction. This process drains the outbox in batches,
+pushing each batch to the fair queue in a single Redis transaction, then records the
+job ids on the notes and deletes the rows.
+
+Every outbox row maps to a deterministic job id. If the dispatcher dies after pushing
+a batch but before committing, the next run finds those jobs already in Redis and
+only finishes the bookkeeping. Workers claim notes atomically (QUEUED -> PROCESSING),
+so a job that is delivered twice is still processed once.
+
+Every RECONCILE_INTERVAL_SECONDS, notes still QUEUED past their deadline are marked
+EXPIRED, and the reconciler looks for notes that have been QUEUED or PROCESSING for
+longer than RECONCILE_STUCK_AFTER_SECONDS and whose job is no longer alive (lost,
+failed, or its worker was killed). They are put back in the outbox, or marked
+FAILED after RECONCILE_MAX_ATTEMPTS jobs.
+"""
+import logging
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+
+from rq.job import Job, JobStatus
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logger import setup_logging
+from app.core.metrics import (
+    NOTES_EXPIRED,
+    NOTES_RECONCILED,
+    OUTBOX_DISPATCHED,
+    clear_multiprocess_dir,
+    start_metrics_server,
+)
+from app.crud import note as crud_note
+from app.models.note import NoteOutbox, NoteStatus
+from app.tasks import fair_queue, note_events
+from app.tasks.queue import q
+
+logger = logging.getLogger(__name__)
+
+# Job states in which a job will still (or is about to) run.
+LIVE_JOB_STATUSES = {
+    JobStatus.CREATED,
+    JobStatus.QUEUED,
+    JobStatus.STARTED,
+    JobStatus.DEFERRED,
+    JobStatus.SCHEDULED,
+}
+
+
+def outbox_job_id(row: NoteOutbox) -> str:
+    """
+    The RQ job id for an outbox row. Stable across retries of the same row.
+    """
+    return f"note-{row.note_id}-{row.id}"
+
+
+def dispatch_batch(db: Session) -> int:
+    """
+    Pushes one batch of outbox rows to Redis and deletes them. Returns the batch size.
+    """
+    rows = crud_note.get_outbox_batch(db, limit=settings.OUTBOX_BATCH_SIZE)
+    if not rows:
+        db.commit()  # Ends the transaction opened by the locking read.
+        return 0
+
+    job_ids = [outbox_job_id(row) for row in rows]
+    check = q.connection.pipeline(transaction=False)
+    for job_id in job_ids:
+        check.exists(Job.key_for(job_id))
+    already_pushed = check.execute()
+
+    pipe = q.connection.pipeline()
+    for row, job_id, exists in zip(rows, job_ids, already_pushed):
+        if exists:
+            continue
+        fair_queue.enqueue_note(
+            row.note_id,
+            owner_id=row.owner_id,
+            weight=row.weight,
+            meta={"request_id": row.request_id},
+            job_id=job_id,
+            pipeline=pipe,
+        )
+    pipe.execute()
+
+    crud_note.mark_outbox_dispatched(db, dispatched=list(zip(rows, job_ids)))
+    fair_queue.release()
+    OUTBOX_DISPATCHED.inc(len(rows))
+    return len(rows)
+
+
+def reconcile(db: Session) -> int:
+    """
+    Re-dispatches (or fails) notes stuck in QUEUED/PROCESSING without a live job.
+    Returns the number of notes acted on.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.RECONCILE_STUCK_AFTER_SECONDS)
+    notes = crud_note.get_stuck_notes(db, updated_before=cutoff, limit=settings.OUTBOX_BATCH_SIZE)
+    if not notes:
+        return 0
+
+    job_ids = [note.job_id for note in notes if note.job_id]
+    jobs = {job.id: job for job in Job.fetch_many(job_ids, connection=q.connection) if job is not None}
+
+    handled = 0
+    for note in notes:
+        job = jobs.get(note.job_id)
+        if job is not None and job.get_status(refresh=False) in LIVE_JOB_STATUSES:
+            continue  # Still waiting for, or held by, a live worker.
+
+        if note.enqueue_attempts >= settings.RECONCILE_MAX_ATTEMPTS:
+            # Conditional, so a worker finishing the note right now is not overwritten.
+            if not crud_note.fail_stuck_note(
+                db,
+                note_id=note.id,
+                updated_before=cutoff,
+                failure_reason=f"Summarization did not complete after {note.enqueue_attempts} attempts.",
+            ):
+                continue
+            note_events.publish_status(note.id, NoteStatus.FAILED)
+            NOTES_RECONCILED.labels(action="failed").inc()
+            logger.warning(f"Note {note.id} failed after {note.enqueue_attempts} attempts.")
+        else:
+            previous_status = note.status
+            crud_note.requeue_note(db, db_note=note, weight=fair_queue.weight_for_role(note.owner.role))
+            note_events.publish_status(note.id, NoteStatus.QUEUED)
+            NOTES_RECONCILED.labels(action="requeued").inc()
+            logger.warning(
+                f"Requeued note {note.id}, stuck in {previous_status.value} without a live job.",
+                extra={"note_id": note.id, "job_id": job.id if job else None},
+            )
+        handled += 1
+    return handled
+
+
+def expire_overdue(db: Session) -> int:
+    """
+    Marks QUEUED notes past their deadline as EXPIRED. Their jobs are skipped by the
+    workers' claim; this makes the status visible without waiting for a worker.
+    """
+    expired = crud_note.expire_overdue_notes(db)
+    if expired:
+        NOTES_EXPIRED.inc(expired)
+        logger.info(f"Expired {expired} notes that passed their deadline.")
+    return expired
+
+
+class Dispatcher:
+    """
+    Runs dispatch_batch() continuously and reconcile() periodically.
+    """
+
+    def __init__(self) -> None:
+        self.stopping = False
+
+    def stop(self, *_) -> None:
+        self.stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info("Outbox dispatcher started.")
+        next_reconcile = time.monotonic() + settings.RECONCILE_INTERVAL_SECONDS
+
+        while not self.stopping:
+            db = SessionLocal()
+            try:
+                dispatched = dispatch_batch(db)
+                if time.monotonic() >= next_reconcile:
+                    expire_overdue(db)
+                    reconcile(db)
+                    next_reconcile = time.monotonic() + settings.RECONCILE_INTERVAL_SECONDS
+            except Exception as e:
+                # Redis or the database is unavailable; the rows stay in the outbox.
+                db.rollback()
+                logger.error(f"Outbox dispatch failed: {e}", exc_info=True)
+                dispatched = 0
+                time.sleep(1)
+            finally:
+                db.close()
+
+            # A full batch means there is more waiting: go again without sleeping.
+            if dispatched < settings.OUTBOX_BATCH_SIZE:
+                time.sleep(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+
+        logger.info("Outbox dispatcher stopped.")
+
+
+def main() -> None:
+    setup_logging()
+    clear_multiprocess_dir()
+    start_metrics_server()
+    Dispatcher().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# app/tasks/fair_queue.py
+import logging
+from typing import Dict, Optional
+
+from redis.client import Pipeline
+from rq.job import Job
+from rq.utils import now
+
+from app.core.config import settings
+from app.models.user import UserRole
+from app.tasks.queue import SUMMARIZE_TASK, q
+
+logger = logging.getLogger(__name__)
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Fair Queuing
+# New jobs are not pushed onto the RQ 'default' list directly. Each owner gets a
+# sub-queue (a Redis list of job ids) and owners with a backlog sit in a ring.
+# release() moves job ids into the RQ list round-robin over that ring, keeping
+# only FAIR_QUEUE_READY_DEPTH jobs ready at a time, so a user who bulk-submits
+# thousands of notes only delays everyone else by one job per turn.
+# Owners can be weighted (by role): an owner with weight N gets N jobs per turn.
+#
+# Requires a single Redis instance (or a primary with replicas), not Redis Cluster:
+# the release script finds the owners to serve while it runs and builds their
+# sub-queue keys itself, so not every key it touches is declared in KEYS, and it
+# moves job ids into RQ's own list, whose key has no hash tag to share a slot with.
+# RQ does not support Redis Cluster either.
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+KEY_PREFIX = "fairq:"
+RING_KEY = KEY_PREFIX + "owners"          # list: owners with a backlog, in service order
+ACTIVE_KEY = KEY_PREFIX + "active"        # set: members of the ring
+WEIGHTS_KEY = KEY_PREFIX + "weights"      # hash: owner -> jobs per turn
+CREDIT_KEY = KEY_PREFIX + "credit"        # hash: owner -> jobs released in the current turn
+SIZE_KEY = KEY_PREFIX + "size"            # int: total jobs across all sub-queues
+OWNER_KEY_PREFIX = KEY_PREFIX + "owner:"  # list per owner: job ids
+
+# KEYS: ring, active, weights, size, owner list | ARGV: owner, job id, weight
+_PUSH_SCRIPT = """
+redis.call('RPUSH', KEYS[5], ARGV[2])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+redis.call('INCR', KEYS[4])
+if redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# KEYS: ring, active, weights, credit, size, rq queue | ARGV: ready depth, owner key prefix
+# Also touches ARGV[2] .. owner for each owner it serves (see the single-instance note above).
+_RELEASE_SCRIPT = """
+local released = 0
+while redis.call('LLEN', KEYS[6]) < tonumber(ARGV[1]) do
+    local owner = redis.call('LINDEX', KEYS[1], 0)
+    if not owner then
+        break
+    end
+    local owner_key = ARGV[2] .. owner
+    local job_id = redis.call('LPOP', owner_key)
+    local rotate = true
+    if job_id then
+        redis.call('RPUSH', KEYS[6], job_id)
+        redis.call('DECR', KEYS[5])
+        released = released + 1
+        local weight = tonumber(redis.call('HGET', KEYS[3], owner) or '1')
+        rotate = redis.call('HINCRBY', KEYS[4], owner, 1) >= weight
+    end
+    local remaining = redis.call('LLEN', owner_key)
+    if rotate or remaining == 0 then
+        redis.call('HDEL', KEYS[4], owner)
+        redis.call('LPOP', KEYS[1])
+        if remaining > 0 then
+            redis.call('RPUSH', KEYS[1], owner)
+        else
+            redis.call('SREM', KEYS[2], owner)
+            redis.call('HDEL', KEYS[3], owner)
+        end
+    end
+end
+return released
+"""
+
+# KEYS: size, owner list, rq queue | ARGV: job id
+_REMOVE_SCRIPT = """
+local removed = redis.call('LREM', KEYS[2], 0, ARGV[1])
+if removed > 0 then
+    redis.call('DECRBY', KEYS[1], removed)
+end
+return removed + redis.call('LREM', KEYS[3], 0, ARGV[1])
+"""
+
+_push_script = q.connection.register_script(_PUSH_SCRIPT)
+_release_script = q.connection.register_script(_RELEASE_SCRIPT)
+_remove_script = q.connection.register_script(_REMOVE_SCRIPT)
+
+
+def _owner_key(owner_id: int) -> str:
+    return f"{OWNER_KEY_PREFIX}{owner_id}"
+
+
+def weight_for_role(role: UserRole) -> int:
+    """
+    Jobs released per round-robin turn for an owner with the given role.
+    """
+    if role == UserRole.ADMIN:
+        return settings.FAIR_QUEUE_ADMIN_WEIGHT
+    return settings.FAIR_QUEUE_AGENT_WEIGHT
+
+
+def enqueue_note(
+    note_id: int,
+    *,
+    owner_id: int,
+    weight: int = 1,
+    meta: Optional[dict] = None,
+    job_id: Optional[str] = None,
+    pipeline: Optional[Pipeline] = None,
+) -> Job:
+    """
+    Creates the summarization job for a note and places it in its owner's sub-queue.
+
+    The job is saved as QUEUED (so RQ tooling, queue-wait timings and cancellation work
+    as usual) but only reaches the RQ list when release() picks it. When a pipeline is
+    given, the caller executes it and is responsible for calling release() afterwards.
+    """
+    job = q.create_job(SUMMARIZE_TASK, args=(note_id,), meta=meta, job_id=job_id)
+    job.enqueued_at = now()
+
+    pipe = pipeline if pipeline is not None else q.connection.pipeline()
+    job.save(pipeline=pipe)
+    job.cleanup(ttl=job.ttl, pipeline=pipe)
+    _push_script(
+        keys=[RING_KEY, ACTIVE_KEY, WEIGHTS_KEY, SIZE_KEY, _owner_key(owner_id)],
+        args=[owner_id, job.id, max(1, weight)],
+        client=pipe,
+    )
+    if pipeline is None:
+        pipe.execute()
+        release()
+    return job
+
+
+def release(ready_depth: Optional[int] = None) -> int:
+    """
+    Tops the RQ queue up to 'ready_depth' (default FAIR_QUEUE_READY_DEPTH) jobs, taking
+    them from the owners' sub-queues in weighted round-robin order. Returns how many
+    jobs were moved. Called after every submission and by workers before each dequeue.
+    """
+    return int(_release_script(
+        keys=[RING_KEY, ACTIVE_KEY, WEIGHTS_KEY, CREDIT_KEY, SIZE_KEY, q.key],
+        args=[ready_depth or settings.FAIR_QUEUE_READY_DEPTH, OWNER_KEY_PREFIX],
+        client=q.connection,
+    ))
+
+
+def remove(job_id: str, *, owner_id: int) -> bool:
+    """
+    Takes a job out of its owner's sub-queue or the RQ list, wherever it is waiting.
+    Returns False if it was in neither (already running or finished).
+    """
+    return int(_remove_script(
+        keys=[SIZE_KEY, _owner_key(owner_id), q.key],
+        args=[job_id],
+        client=q.connection,
+    )) > 0
+
+
+def backlog_size() -> int:
+    """
+    Total number of jobs waiting in the owners' sub-queues (not yet released to RQ).
+    """
+    return int(q.connection.get(SIZE_KEY) or 0)
+
+
+def owner_backlogs() -> Dict[int, int]:
+    """
+    Number of jobs waiting in each owner's sub-queue, for owners that have any.
+    """
+    owners = [int(owner) for owner in q.connection.lrange(RING_KEY, 0, -1)]
+    pipe = q.connection.pipeline(transaction=False)
+    for owner_id in owners:
+        pipe.llen(_owner_key(owner_id))
+    return dict(zip(owners, (int(length) for length in pipe.execute())))
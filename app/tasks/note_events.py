@@ -0,0 +1,110 @@
+# app/tasks/note_events.py
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from app.core import cache
+from app.core.redis import get_async_redis
+from app.tasks.queue import q
+
+logger = logging.getLogger(__name__)
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Note Status Events
+# Workers and the API publish a note's new status on a Redis channel whenever they
+# change it, so clients can follow a note (GET /notes/{note_id}/events) instead of
+# polling it. Publishing is best effort: the database stays the source of truth and
+# streams re-read it when they have been idle for a while.
+#
+# Each API process holds a single pattern subscription for all notes and fans the
+# messages out to its open streams, so streams do not take a Redis connection each.
+# The same connection receives the note cache invalidations (app/core/cache.py), so
+# the hub is started with the application rather than by the first stream.
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+CHANNEL_PREFIX = "summarizer:note-events:"
+DELETED = "DELETED"  # Published when a note is deleted; not a NoteStatus
+
+
+def publish_status(note_id: int, status: str) -> None:
+    """
+    Announces a note's new status (a NoteStatus value, or DELETED). Never raises.
+    """
+    try:
+        q.connection.publish(f"{CHANNEL_PREFIX}{note_id}", getattr(status, "value", status))
+    except Exception as e:
+        logger.warning(f"Could not publish the status of note {note_id}: {e}")
+
+
+class NoteEventHub:
+    """
+    Relays published note statuses to in-process subscribers (asyncio queues) and
+    applies note cache invalidations to this process.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Starts the listener on the running event loop, if it is not running yet.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    @asynccontextmanager
+    async def subscribe(self, note_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Yields a queue that receives the note's statuses (as str) while the context is open.
+        """
+        self.start()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[note_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[note_id].discard(queue)
+            if not self._subscribers[note_id]:
+                del self._subscribers[note_id]
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_async_redis().pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                await pubsub.subscribe(cache.INVALIDATE_CHANNEL)
+                # Invalidations published while this process was not subscribed are lost.
+                cache.clear_local()
+                while True:
+                    # A short timeout instead of listen(): an idle subscription must not
+                    # run into the pool's read timeout.
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message["type"] == "message":
+                        cache.drop_local(int(note_id) for note_id in message["data"].split(b","))
+                    elif message and message["type"] == "pmessage":
+                        note_id = int(message["channel"][len(CHANNEL_PREFIX):])
+                        for queue in self._subscribers.get(note_id, ()):
+                            queue.put_nowait(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Streams fall back to re-reading the database until the subscription is back.
+                logger.warning(f"Note event subscription failed, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+
+hub = NoteEventHub()
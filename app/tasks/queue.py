@@ -1,15 +1,36 @@
 # app/tasks/queue.py
-from redis import Redis
+from datetime import datetime, timezone
+
 from rq import Queue
 
-from app.core.config import settings
+from app.core.redis import redis_client
 
-# Establish a connection to the Redis server using the URL from settings.
-# Note: decode_responses=True is NOT used, as RQ expects bytes.
-redis_conn = Redis.from_url(settings.REDIS_URL)
+# The process's shared, pooled Redis client (see app/core/redis.py). Enqueueing,
+# queue-depth reads and everything else that goes through 'q.connection' use it.
+redis_conn = redis_client
 
 # Create a Redis Queue instance named 'default'.
 # This 'q' object is the main entry point for enqueueing background jobs
 # from anywhere in the application (e.g., from an API endpoint).
 # The connection is passed explicitly, which is the recommended practice.
-q = Queue("default", connection=redis_conn)
\ No newline at end of file
+q = Queue("default", connection=redis_conn)
+
+# Jobs reference the summarization task by its import path, so enqueueing from the API
+# does not import app.tasks.summarize_task (and with it torch and the T5 model).
+SUMMARIZE_TASK = "app.tasks.summarize_task.summarize_text_task"
+
+
+def oldest_job_age(queue: Queue = q) -> float:
+    """
+    Seconds since the job at the head of the queue was enqueued (0 if the queue is empty).
+    """
+    job_ids = queue.get_job_ids(0, 1)
+    if not job_ids:
+        return 0.0
+    job = queue.fetch_job(job_ids[0])
+    if job is None or job.enqueued_at is None:
+        return 0.0
+    enqueued_at = job.enqueued_at
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - enqueued_at).total_seconds())
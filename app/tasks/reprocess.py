@@ -0,0 +1,130 @@
+# app/tasks/reprocess.py
+"""
+Summarizes finished notes again, e.g. the FAILED notes left behind by a model outage:
+
+    python -m app.tasks.reprocess --status FAILED --reason-contains "model is not available"
+
+Admins can do the same through POST /admin/notes/reprocess, which handles one batch
+per request and returns a cursor (next_after_id) to continue with.
+
+Matching notes are reset to QUEUED in id order, in batches of REPROCESS_BATCH_SIZE,
+each with one bulk UPDATE that also writes the notes' outbox rows. The dispatcher
+then pushes them to the fair queue in pipelined batches, exactly like new notes, so
+reprocessed work is shared round-robin with everyone else's. Batches are spaced by
+REPROCESS_BATCH_PAUSE_SECONDS.
+
+Only finished notes are selected and a requeued note is QUEUED, so re-running an
+interrupted (or completed) reprocessing never queues a note twice.
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logger import setup_logging
+from app.core.metrics import NOTES_REPROCESSED
+from app.crud import note as crud_note
+from app.models.note import NoteStatus, SummaryEngine
+from app.models.user import UserRole
+from app.schemas.note import NoteReprocessRequest, NoteReprocessResult
+from app.tasks import fair_queue
+from app.tasks.cancellation import clear_abort
+
+logger = logging.getLogger(__name__)
+
+
+def reprocess_notes(
+    db: Session,
+    *,
+    criteria: NoteReprocessRequest,
+    request_id: Optional[str] = None,
+    max_batches: Optional[int] = None,
+) -> NoteReprocessResult:
+    """
+    Requeues the notes matching 'criteria' in id order, logging progress after every
+    batch. With 'max_batches', stops after that many batches and returns the cursor
+    (next_after_id) to continue from.
+    """
+    matched = crud_note.count_reprocessable_notes(db, criteria=criteria)
+    if criteria.limit is not None:
+        matched = min(matched, criteria.limit)
+    if criteria.dry_run or not matched:
+        return NoteReprocessResult(matched=matched, requeued=0, batches=0, dry_run=criteria.dry_run)
+
+    weights = {role: fair_queue.weight_for_role(role) for role in UserRole}
+    requeued = batches = 0
+    after_id = criteria.after_id
+    while requeued < matched:
+        if max_batches is not None and batches >= max_batches:
+            return NoteReprocessResult(
+                matched=matched, requeued=requeued, batches=batches, dry_run=False, next_after_id=after_id
+            )
+        if batches:
+            time.sleep(settings.REPROCESS_BATCH_PAUSE_SECONDS)
+        size = min(settings.REPROCESS_BATCH_SIZE, matched - requeued)
+        # The cursor keeps a note that fails again during the run from being selected twice.
+        batch_criteria = criteria.model_copy(update={"after_id": after_id})
+        note_ids = crud_note.requeue_notes_batch(
+            db, criteria=batch_criteria, limit=size, weights=weights, request_id=request_id
+        )
+        # Their cached DONE/FAILED responses are no longer current, and a cancelled
+        # note's abort flag would stop its new job.
+        cache.invalidate_notes(note_ids)
+        clear_abort(note_ids)
+        count = len(note_ids)
+        requeued += count
+        batches += 1
+        if note_ids:
+            after_id = max(note_ids)
+        NOTES_REPROCESSED.inc(count)
+        logger.info(
+            f"Reprocessing: requeued {requeued}/{matched} notes.",
+            extra={"requeued": requeued, "matched": matched, "batch": batches},
+        )
+        if count < size:
+            break  # The rest changed status (or is being requeued by another run) meanwhile.
+
+    return NoteReprocessResult(matched=matched, requeued=requeued, batches=batches, dry_run=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="append", type=NoteStatus, dest="statuses",
+                        help="Status to select; repeat for several (default: FAILED).")
+    parser.add_argument("--reason-contains", help="Only notes whose failure reason contains this text.")
+    parser.add_argument("--engine", type=SummaryEngine, help="Only notes summarized by this engine.")
+    parser.add_argument("--owner-id", type=int, help="Only notes of this owner.")
+    parser.add_argument("--created-from", help="Only notes created at or after this ISO 8601 time.")
+    parser.add_argument("--created-to", help="Only notes created before this ISO 8601 time.")
+    parser.add_argument("--after-id", type=int, help="Only notes with a higher id, e.g. to resume a run.")
+    parser.add_argument("--limit", type=int, help="Reprocess at most this many notes.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the matching notes.")
+    args = parser.parse_args()
+
+    setup_logging()
+    criteria = NoteReprocessRequest(
+        statuses=args.statuses or [NoteStatus.FAILED],
+        failure_reason_contains=args.reason_contains,
+        engine=args.engine,
+        owner_id=args.owner_id,
+        created_from=args.created_from,
+        created_to=args.created_to,
+        after_id=args.after_id,
+        limit=args.limit,
+        dry_run=args.dry_run,
+    )
+    db = SessionLocal()
+    try:
+        result = reprocess_notes(db, criteria=criteria)
+    finally:
+        db.close()
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
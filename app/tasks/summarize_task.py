@@ -1,20 +1,42 @@
 # app/tasks/summarize_task.py
 import os
 import time
+import random
 import logging
+import cProfile
+import marshal
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
 import torch
-from transformers import T5ForConditionalGeneration, T5Tokenizer
+from rq import get_current_job
+from transformers import StoppingCriteria, StoppingCriteriaList, T5ForConditionalGeneration, T5Tokenizer
 
+from app.core import cache as note_cache
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.crud.note import get_note, update_note
-from app.models.note import NoteStatus
+from app.core.logger import request_id_var, setup_logging
+from app.core.metrics import (
+    INFERENCE_STAGE_SECONDS,
+    INFERENCE_TOKENS,
+    JOB_OUTCOMES,
+    NOTES_EXPIRED,
+    RESULT_WRITE_SECONDS,
+    SUMMARIES_BY_ENGINE,
+)
+from app.crud.note import claim_note, create_note_profile, expire_note, finish_note, get_note
+from app.models.note import NoteStatus, SummaryEngine
+from app.tasks import extractive
+from app.tasks.admission import get_queue_state, record_completion
+from app.tasks.cancellation import abort_requested
+from app.tasks.note_events import publish_status
 
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # Setup: Logging, Device, and Model Configuration
 # This part runs once when the worker process starts.
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Determine the device to run the model on (GPU if available, otherwise CPU)
@@ -29,23 +51,298 @@ MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "./model_cache")  # Flexible path
 tokenizer = None
 model = None
 
+
+def _has_safetensors() -> Optional[bool]:
+    # None lets from_pretrained fall back to pytorch_model.bin for caches made before
+    # download_model.py saved safetensors.
+    return True if os.path.exists(os.path.join(MODEL_CACHE_DIR, "model.safetensors")) else None
+
+
+# Seconds spent in each loading phase, reported by the worker with its cold start.
+COLD_START: Dict[str, float] = {}
+
 try:
     logger.info(f"Loading tokenizer and model from: {MODEL_CACHE_DIR}")
     # This assumes the model has been downloaded to this path,
     # either by a pre-run script or by a previous worker run.
+    phase_started = time.perf_counter()
     tokenizer = T5Tokenizer.from_pretrained(MODEL_CACHE_DIR)
-    model = T5ForConditionalGeneration.from_pretrained(MODEL_CACHE_DIR).to(device)
+    COLD_START["load_tokenizer"] = time.perf_counter() - phase_started
+
+    # download_model.py saves the weights as safetensors, which from_pretrained
+    # memory-maps instead of reading the whole file into a buffer and copying it.
+    phase_started = time.perf_counter()
+    model = T5ForConditionalGeneration.from_pretrained(MODEL_CACHE_DIR, use_safetensors=_has_safetensors()).to(device)
+    model.eval()
+    COLD_START["load_model"] = time.perf_counter() - phase_started
     logger.info("Model and tokenizer loaded successfully.")
 except OSError:
     logger.error(
         f"Model not found in cache directory: {MODEL_CACHE_DIR}. "
-        "The worker will mark tasks as FAILED until the model is available. "
+        "The worker will use the extractive engine until the model is available. "
         "Run 'python download_model.py' locally or ensure the Docker build process completes."
     )
 except Exception as e:
     logger.error(f"An unexpected error occurred while loading the model: {e}", exc_info=True)
 
 
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Inference
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+class SummarizationAborted(Exception):
+    """
+    Raised when generation was stopped because the note was cancelled.
+    """
+
+
+class _AbortCriteria(StoppingCriteria):
+    """
+    Stops generate() between decode steps once should_stop() returns True.
+    should_stop is polled at most every ABORT_CHECK_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, should_stop: Callable[[], bool]):
+        self.should_stop = should_stop
+        self.triggered = False
+        self._next_check = 0.0
+
+    def __call__(self, input_ids, scores, **kwargs):
+        now = time.perf_counter()
+        if not self.triggered and now >= self._next_check:
+            self._next_check = now + settings.ABORT_CHECK_INTERVAL_SECONDS
+            self.triggered = bool(self.should_stop())
+        return torch.full((input_ids.shape[0],), self.triggered, dtype=torch.bool, device=input_ids.device)
+
+
+def summarize_batch(
+    texts: List[str],
+    *,
+    num_beams: Optional[int] = None,
+    max_input_length: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    observe: bool = True,
+) -> Tuple[List[str], Dict[str, float]]:
+    """
+    Summarizes a batch of texts with the loaded model in one generate() call.
+
+    Returns the summaries and per-stage statistics for the batch: the time spent in
+    the tokenize, encoder, decoder and detokenize stages (seconds), the number of
+    decoder steps and the total input/output token counts. 'generate' (encoder +
+    decoder) and 'decode' (detokenize) are also recorded as Prometheus metrics,
+    along with the per-text token counts.
+
+    num_beams and max_input_length default to SUMMARY_NUM_BEAMS and SUMMARY_MAX_INPUT_TOKENS.
+    If should_stop is given and returns True during generation, SummarizationAborted is raised.
+    observe=False leaves the Prometheus metrics untouched (used for warmup).
+    """
+    num_beams = num_beams or settings.SUMMARY_NUM_BEAMS
+    max_input_length = max_input_length or settings.SUMMARY_MAX_INPUT_TOKENS
+
+    started = time.perf_counter()
+    input_texts = ["summarize: " + text for text in texts]
+    inputs = tokenizer(
+        input_texts, return_tensors="pt", max_length=max_input_length, truncation=True, padding=True
+    )
+    input_ids = inputs.input_ids.to(device)
+    attention_mask = inputs.attention_mask.to(device)
+    tokenized = time.perf_counter()
+
+    # Run the encoder separately so its cost can be told apart from the decoder loop;
+    # generate() reuses the given encoder_outputs instead of encoding again.
+    # inference_mode also skips the autograd version counters that no_grad keeps.
+    abort = _AbortCriteria(should_stop) if should_stop else None
+    with torch.inference_mode():
+        encoder_outputs = model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask)
+        encoded = time.perf_counter()
+
+        summary_ids = model.generate(
+            input_ids,
+            attention_mask=attention_mask,
+            encoder_outputs=encoder_outputs,
+            max_length=150,
+            min_length=30,
+            num_beams=num_beams,
+            early_stopping=True,
+            stopping_criteria=StoppingCriteriaList([abort]) if abort else None,
+        )
+    generated = time.perf_counter()
+    if abort and abort.triggered:
+        raise SummarizationAborted(f"Generation stopped after {generated - encoded:.2f}s")
+
+    summaries = tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+    decoded = time.perf_counter()
+
+    input_tokens = attention_mask.sum(dim=1).tolist()
+    output_tokens = (summary_ids != tokenizer.pad_token_id).sum(dim=1).tolist()
+    stats = {
+        "tokenize": tokenized - started,
+        "encoder": encoded - tokenized,
+        "decoder": generated - encoded,
+        "detokenize": decoded - generated,
+        "decode_steps": summary_ids.shape[-1] - 1,  # the first token is the decoder start token
+        "input_tokens": sum(input_tokens),
+        "output_tokens": sum(output_tokens),
+    }
+    if not observe:
+        return summaries, stats
+    INFERENCE_STAGE_SECONDS.labels(stage="tokenize").observe(stats["tokenize"])
+    INFERENCE_STAGE_SECONDS.labels(stage="generate").observe(stats["encoder"] + stats["decoder"])
+    INFERENCE_STAGE_SECONDS.labels(stage="decode").observe(stats["detokenize"])
+    for count in input_tokens:
+        INFERENCE_TOKENS.labels(direction="input").observe(count)
+    for count in output_tokens:
+        INFERENCE_TOKENS.labels(direction="output").observe(count)
+    return summaries, stats
+
+
+_WARMUP_SENTENCE = (
+    "The quarterly report shows that revenue grew in every region, while costs stayed "
+    "flat and the support team closed more tickets than in any previous quarter. "
+)
+
+
+def warmup() -> Dict[str, float]:
+    """
+    Runs one summarization per length in WORKER_WARMUP_TOKENS on synthetic text, so
+    the first real jobs do not pay for lazy initialisation (kernel selection, memory
+    pools, first-call overheads) at every input size. Returns the seconds spent per
+    length ("warmup_<tokens>"); metrics are not recorded.
+    """
+    timings: Dict[str, float] = {}
+    if not model or not tokenizer:
+        return timings
+    sentence_tokens = max(1, count_tokens(_WARMUP_SENTENCE))
+    for length in settings.WORKER_WARMUP_TOKENS:
+        length = min(length, settings.SUMMARY_MAX_INPUT_TOKENS)
+        text = _WARMUP_SENTENCE * (length // sentence_tokens + 1)
+        started = time.perf_counter()
+        summarize_batch([text], max_input_length=length, observe=False)
+        timings[f"warmup_{length}"] = time.perf_counter() - started
+    return timings
+
+
+def allocator_stats() -> Dict[str, int]:
+    """
+    Bytes allocated and reserved by PyTorch's CUDA caching allocator. Empty on CPU,
+    where tensors come from the process heap and show up in its RSS.
+    """
+    if device.type != "cuda":
+        return {}
+    return {
+        "cuda_allocated": torch.cuda.memory_allocated(device),
+        "cuda_reserved": torch.cuda.memory_reserved(device),
+    }
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens in a text, without special tokens.
+    """
+    return len(tokenizer(text, add_special_tokens=False).input_ids)
+
+
+def chunk_text(
+    text: str,
+    *,
+    chunk_tokens: Optional[int] = None,
+    overlap_sentences: Optional[int] = None,
+) -> List[str]:
+    """
+    Splits a text on sentence boundaries into chunks of at most chunk_tokens tokens
+    (default SUMMARY_CHUNK_TOKENS). Each chunk starts with the last overlap_sentences
+    sentences of the previous one (default SUMMARY_CHUNK_OVERLAP_SENTENCES), so context
+    that spans a boundary is seen by both chunks. A single sentence longer than
+    chunk_tokens becomes a chunk of its own and is truncated by the tokenizer.
+    """
+    chunk_tokens = chunk_tokens or settings.SUMMARY_CHUNK_TOKENS
+    if overlap_sentences is None:
+        overlap_sentences = settings.SUMMARY_CHUNK_OVERLAP_SENTENCES
+
+    sentences = extractive.split_sentences(text)
+    if not sentences:
+        return []
+    lengths = [len(ids) for ids in tokenizer(sentences, add_special_tokens=False).input_ids]
+
+    chunks: List[str] = []
+    current: List[Tuple[str, int]] = []
+    carried = 0  # Sentences at the start of 'current' that repeat the previous chunk
+    for sentence, length in zip(sentences, lengths):
+        if current and sum(n for _, n in current) + length > chunk_tokens:
+            if len(current) > carried:
+                chunks.append(" ".join(s for s, _ in current))
+                current = current[-overlap_sentences:] if overlap_sentences > 0 else []
+            # Drop overlap that would not leave room for the new sentence.
+            while current and sum(n for _, n in current) + length > chunk_tokens:
+                current.pop(0)
+            carried = len(current)
+        current.append((sentence, length))
+    if len(current) > carried:
+        chunks.append(" ".join(s for s, _ in current))
+    return chunks
+
+
+def summarize_long(
+    text: str, *, should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[str, Dict[str, float]]:
+    """
+    Map-reduce summarization for texts longer than SUMMARY_MAX_INPUT_TOKENS.
+
+    Map: the text is chunked (see chunk_text) and all chunks are summarized in one
+    batched generate() call. If the joined chunk summaries are still too long, they
+    are mapped again (at most SUMMARY_MAX_MAP_PASSES passes in total).
+    Reduce: the joined summaries are summarized once more into the final summary.
+
+    The returned statistics are the sums over all passes, plus 'chunks' (chunks
+    summarized across map passes) and 'map_passes'.
+    """
+    totals: Dict[str, float] = {"chunks": 0, "map_passes": 0}
+
+    def add(stats: Dict[str, float]) -> None:
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+
+    while (
+        totals["map_passes"] < settings.SUMMARY_MAX_MAP_PASSES
+        and count_tokens(text) > settings.SUMMARY_MAX_INPUT_TOKENS
+    ):
+        chunks = chunk_text(text, chunk_tokens=min(settings.SUMMARY_CHUNK_TOKENS, settings.SUMMARY_MAX_INPUT_TOKENS))
+        if len(chunks) < 2:
+            break
+        partial_summaries, stats = summarize_batch(chunks, should_stop=should_stop)
+        add(stats)
+        totals["chunks"] += len(chunks)
+        totals["map_passes"] += 1
+        text = " ".join(partial_summaries)
+
+    summaries, stats = summarize_batch([text], should_stop=should_stop)
+    add(stats)
+    return summaries[0], totals
+
+
+def summarize(text: str, *, should_stop: Optional[Callable[[], bool]] = None) -> Tuple[str, Dict[str, float]]:
+    """
+    Summarizes a single text, map-reduce style if it is longer than SUMMARY_MAX_INPUT_TOKENS
+    and chunking is enabled. See summarize_batch and summarize_long for the returned statistics.
+    """
+    if settings.SUMMARY_CHUNK_TOKENS > 0 and count_tokens(text) > settings.SUMMARY_MAX_INPUT_TOKENS:
+        return summarize_long(text, should_stop=should_stop)
+    summaries, stats = summarize_batch([text], should_stop=should_stop)
+    return summaries[0], stats
+
+
+def _queue_wait_ms(job, note) -> Optional[float]:
+    """
+    Time between the job being enqueued (or the note being created) and now.
+    """
+    enqueued_at = job.enqueued_at if job and job.enqueued_at else note.created_at
+    if enqueued_at is None:
+        return None
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - enqueued_at).total_seconds() * 1000)
+
+
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # The main RQ task function
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
@@ -54,63 +351,176 @@ def summarize_text_task(note_id: int):
     """
     The background task that performs summarization on a note using a T5 model.
     This function is executed by an RQ worker.
+
+    When PROFILE_SAMPLE_RATE is N > 0, 1 in N jobs is run under cProfile and the
+    profile is stored in the note_profiles table for admins to download.
     """
-    logger.info(f"Processing task for note_id: {note_id}")
+    # Bind the id of the request that enqueued this job to every log line below.
+    job = get_current_job()
+    token = request_id_var.set(job.meta.get("request_id") if job else None)
+    try:
+        rate = settings.PROFILE_SAMPLE_RATE
+        if rate > 0 and random.randrange(rate) == 0:
+            summarized = _profile_job(note_id, job)
+        else:
+            summarized = _summarize_note(note_id, job)
+        # Stale, cancelled and failed jobs take little worker time; counting them would
+        # inflate the throughput that admission control divides the backlog by.
+        if summarized:
+            _record_completion()
+    finally:
+        request_id_var.reset(token)
 
-    # Fail fast if the model could not be loaded on worker startup
-    if not model or not tokenizer:
-        db = SessionLocal()
-        note = get_note(db, note_id=note_id)
-        if note:
-            error_msg = "AI model is not available on the worker."
-            update_note(db, db_note=note, note_in={"status": NoteStatus.FAILED, "failure_reason": error_msg})
+
+def _record_completion():
+    # Feeds the throughput estimate used by admission control; must never fail the job.
+    try:
+        record_completion()
+    except Exception as e:
+        logger.warning(f"Could not record job completion: {e}")
+
+
+def _profile_job(note_id: int, job) -> bool:
+    profiler = cProfile.Profile()
+    summarized = profiler.runcall(_summarize_note, note_id, job)
+    profiler.create_stats()
+
+    db = SessionLocal()
+    try:
+        # marshal.dumps(stats) is exactly what pstats.Stats.dump_stats() writes to a .prof file.
+        create_note_profile(db, note_id=note_id, data=marshal.dumps(profiler.stats))
+        logger.info(f"Stored sampled profile for note {note_id}.")
+    except Exception as e:
+        logger.error(f"Could not store the profile for note {note_id}: {e}", exc_info=True)
+    finally:
         db.close()
-        logger.error(f"Task for note {note_id} failed: {error_msg}")
-        return
+    return summarized
+
+
+def _announce_final_state(db, note) -> None:
+    # Pre-fills the API's response cache so the client's next poll skips the database,
+    # then tells streaming clients; must never fail the job.
+    try:
+        note_cache.store_note(db, note=note, local=False)
+    except Exception as e:
+        logger.warning(f"Could not cache note {note.id}: {e}")
+    publish_status(note.id, note.status)
+
+
+def _choose_engine() -> Tuple[SummaryEngine, str]:
+    """
+    Picks the engine for the next job and the reason for it. Falls back to the
+    extractive engine when the model failed to load, or when the backlog has reached
+    EXTRACTIVE_FALLBACK_BACKLOG, trading summary quality for draining the queue faster.
+    """
+    if not model or not tokenizer:
+        return SummaryEngine.EXTRACTIVE, "model_unavailable"
+    if settings.EXTRACTIVE_FALLBACK_BACKLOG > 0:
+        try:
+            depth = get_queue_state().depth
+        except Exception as e:
+            logger.warning(f"Could not read the queue depth, using the model: {e}")
+            depth = 0
+        if depth >= settings.EXTRACTIVE_FALLBACK_BACKLOG:
+            return SummaryEngine.EXTRACTIVE, "overload"
+    return SummaryEngine.ABSTRACTIVE, "default"
+
+
+def _summarize_note(note_id: int, job=None) -> bool:
+    """
+    Summarizes a note and writes the result. Returns True if the note is now DONE,
+    False if the job was a no-op, was cancelled or failed.
+    """
+    logger.info(f"Processing task for note_id: {note_id}")
 
     db = SessionLocal()
     try:
+        # 1. Claim the note (QUEUED -> PROCESSING) atomically, so a duplicate job is a no-op
+        claim_started = time.perf_counter()
+        if not claim_note(db, note_id=note_id):
+            if expire_note(db, note_id=note_id):
+                publish_status(note_id, NoteStatus.EXPIRED)
+                JOB_OUTCOMES.labels(status=NoteStatus.EXPIRED.value).inc()
+                NOTES_EXPIRED.inc()
+                logger.info(f"Note {note_id} passed its deadline before being picked up; marked EXPIRED.")
+            else:
+                logger.warning(f"Note {note_id} is missing, cancelled or already claimed. Task may be stale.")
+            return False
+        publish_status(note_id, NoteStatus.PROCESSING)
         note = get_note(db, note_id=note_id)
         if not note:
             logger.warning(f"Note with id {note_id} not found in database. Task may be stale.")
-            return
+            return False
+        claim_ms = (time.perf_counter() - claim_started) * 1000
+        queue_wait_ms = _queue_wait_ms(job, note)
 
-        # 1. Update status to PROCESSING
-        update_note(db, db_note=note, note_in={"status": NoteStatus.PROCESSING})
-
-        # 2. Perform the actual AI summarization
+        # 2. Perform the actual summarization, with T5 unless it is unavailable or overloaded
+        engine, reason = _choose_engine()
+        stage_timings = {"queue_wait_ms": queue_wait_ms, "claim_ms": claim_ms}
         start_time = time.time()
-
-        input_text = "summarize: " + note.raw_text
-        input_ids = tokenizer(input_text, return_tensors="pt", max_length=1024, truncation=True).input_ids.to(device)
-
-        summary_ids = model.generate(
-            input_ids,
-            max_length=150,
-            min_length=30,
-            num_beams=4,
-            early_stopping=True,
-        )
-        summary_text = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-
-        end_time = time.time()
+        if engine == SummaryEngine.EXTRACTIVE:
+            summary_text = extractive.summarize(note.raw_text)
+            end_time = time.time()
+            stage_timings["extractive_ms"] = (end_time - start_time) * 1000
+        else:
+            summary_text, stats = summarize(note.raw_text, should_stop=lambda: abort_requested(note_id))
+            end_time = time.time()
+            if abort_requested(note_id):  # Cancelled after the last check during generation
+                raise SummarizationAborted("Cancelled before the result was written")
+            stage_timings.update({
+                "tokenize_ms": stats["tokenize"] * 1000,
+                "encoder_ms": stats["encoder"] * 1000,
+                "decoder_ms": stats["decoder"] * 1000,
+                "decode_steps": stats["decode_steps"],
+                "detokenize_ms": stats["detokenize"] * 1000,
+            })
+            if stats.get("chunks"):
+                stage_timings.update({"chunks": stats["chunks"], "map_passes": stats["map_passes"]})
         processing_time = (end_time - start_time) * 1000
 
         # 3. Save the successful result to the database
-        logger.info(f"Summarization for note {note_id} completed in {processing_time:.2f} ms.")
+        logger.info(f"Summarization for note {note_id} completed in {processing_time:.2f} ms ({engine.value}, {reason}).")
+        write_started = time.perf_counter()
         update_data = {
             "status": NoteStatus.DONE,
             "summary": summary_text,
+            "engine": engine,
             "processing_time_ms": processing_time,
             "failure_reason": None,
+            "stage_timings": stage_timings,
         }
-        update_note(db, db_note=note, note_in=update_data)
+        # Only written if the note is still PROCESSING: a cancel that lands after the last
+        # abort check above must not be overwritten with DONE.
+        note = finish_note(db, note_id=note_id, values=update_data)
+        if note is None:
+            raise SummarizationAborted("Cancelled while the result was being written")
+        # The result write can only be timed once it has happened, so it is reported as a
+        # metric rather than stored with the result (which would take a second write).
+        RESULT_WRITE_SECONDS.observe(time.perf_counter() - write_started)
+        JOB_OUTCOMES.labels(status=NoteStatus.DONE.value).inc()
+        SUMMARIES_BY_ENGINE.labels(engine=engine.value, reason=reason).inc()
+        _announce_final_state(db, note)
+        return True
+
+    except SummarizationAborted as e:
+        # The note is already CANCELLED (or deleted) by the API; leave it as it is.
+        JOB_OUTCOMES.labels(status=NoteStatus.CANCELLED.value).inc()
+        logger.info(f"Summarization for note {note_id} was cancelled: {e}")
+        return False
 
     except Exception as e:
         logger.error(f"An error occurred during summarization for note {note_id}: {e}", exc_info=True)
         if 'note' in locals() and note:
-            update_note(db, db_note=note, note_in={"status": NoteStatus.FAILED, "failure_reason": str(e)[:512]})
+            db.rollback()
+            failed = finish_note(db, note_id=note_id, values={"status": NoteStatus.FAILED, "failure_reason": str(e)[:512]})
+            if failed is None:
+                JOB_OUTCOMES.labels(status=NoteStatus.CANCELLED.value).inc()
+                logger.info(f"Note {note_id} was cancelled or deleted before its failure was recorded.")
+                return False
+            _announce_final_state(db, failed)
+        JOB_OUTCOMES.labels(status=NoteStatus.FAILED.value).inc()
+        return False
 
     finally:
         logger.info(f"DB session closed for note_id: {note_id}")
-        db.close()
\ No newline at end of file
+        db.close()
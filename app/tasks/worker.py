@@ -0,0 +1,195 @@
+# app/tasks/worker.py
+"""
+Entry point for summarization workers:
+
+    python -m app.tasks.worker
+
+Runs an RQ SimpleWorker on the 'default' queue. Jobs run in the worker process
+itself (no fork per job), so the T5 model is loaded once when this module
+imports app.tasks.summarize_task, not once per job.
+
+Start-up is split into phases (interpreter, imports, load_tokenizer, load_model,
+warmup) that are logged and exported as summarizer_worker_cold_start_seconds.
+The worker only registers with RQ, and so only pulls jobs, once the model has been
+loaded and warmed up on synthetic inputs (WORKER_WARMUP_TOKENS). At that point it
+also sets a readiness key in Redis holding its cold-start report; the key is
+refreshed with every RQ heartbeat and deleted when the worker exits.
+
+Long-running workers grow, mostly through allocator fragmentation from inputs of
+varying length. After every job the worker reads its RSS (and the PyTorch CUDA
+allocator on GPU). Once past WORKER_MAX_RSS_MB / WORKER_MAX_CUDA_RESERVED_MB, or
+after WORKER_MAX_JOBS jobs, it stops taking jobs and exits cleanly, and the
+autoscaler starts a fresh one. The job that crossed the budget has already
+finished, so no note is left in PROCESSING by an OOM kill.
+"""
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+from redis import Redis
+from rq import SimpleWorker
+
+from app.core.config import settings
+from app.core.logger import setup_logging
+from app.core.metrics import (
+    WORKER_COLD_START_SECONDS,
+    WORKER_JOB_MEMORY_GROWTH_BYTES,
+    WORKER_MEMORY_BYTES,
+    WORKER_RECYCLES,
+)
+from app.tasks import fair_queue
+from app.tasks.queue import q, redis_conn
+
+logger = logging.getLogger(__name__)
+
+READY_KEY_PREFIX = "summarizer:worker:ready:"
+
+
+def ready_workers(connection: Redis = redis_conn) -> List[dict]:
+    """
+    The readiness reports of all workers that are warm and taking jobs.
+    """
+    keys = list(connection.scan_iter(match=READY_KEY_PREFIX + "*"))
+    if not keys:
+        return []
+    return [json.loads(value) for value in connection.mget(keys) if value]
+
+
+class FairWorker(SimpleWorker):
+    """
+    A SimpleWorker that tops up the RQ queue from the per-owner fair queues before
+    every dequeue, so jobs keep flowing even when no new notes are being submitted.
+    It advertises itself as ready while registered with RQ, and retires itself once
+    over its memory or job budget.
+    """
+
+    cold_start: Optional[Dict[str, float]] = None
+    jobs_done = 0
+    recycle_reason: Optional[str] = None
+
+    @property
+    def ready_key(self) -> str:
+        return READY_KEY_PREFIX + self.name
+
+    def register_birth(self):
+        super().register_birth()
+        report = {"name": self.name, "pid": self.pid, "hostname": self.hostname, "cold_start": self.cold_start or {}}
+        self.connection.set(self.ready_key, json.dumps(report), ex=self.worker_ttl + settings.WORKER_READY_TTL_SECONDS)
+
+    def heartbeat(self, timeout=None, pipeline=None):
+        super().heartbeat(timeout, pipeline)
+        connection = pipeline if pipeline is not None else self.connection
+        connection.expire(self.ready_key, (timeout or self.worker_ttl) + settings.WORKER_READY_TTL_SECONDS)
+
+    def register_death(self):
+        self.connection.delete(self.ready_key)
+        super().register_death()
+
+    def execute_job(self, job, queue):
+        rss_before = _process.memory_info().rss
+        super().execute_job(job, queue)
+        self.jobs_done += 1
+        try:
+            self._check_budget(rss_before)
+        except Exception as e:
+            logger.warning(f"Could not check the worker memory budget: {e}")
+
+    def _check_budget(self, rss_before: int) -> None:
+        memory = {"rss": _process.memory_info().rss}
+        from app.tasks import summarize_task
+        memory.update(summarize_task.allocator_stats())
+        for kind, value in memory.items():
+            WORKER_MEMORY_BYTES.labels(kind=kind).set(value)
+        WORKER_JOB_MEMORY_GROWTH_BYTES.observe(max(0, memory["rss"] - rss_before))
+
+        reason, detail = _over_budget(memory, self.jobs_done)
+        if reason is None or self.recycle_reason is not None:
+            return
+        self.recycle_reason = reason
+        WORKER_RECYCLES.labels(reason=reason).inc()
+        logger.warning(
+            f"Worker {self.name} is over its {detail}; exiting to be replaced.",
+            extra={
+                "reason": reason,
+                "jobs_done": self.jobs_done,
+                **{f"{kind}_mb": round(value / 2**20, 1) for kind, value in memory.items()},
+            },
+        )
+        # Checked by RQ's work loop before the next dequeue: the same warm shutdown a
+        # SIGTERM between jobs would trigger.
+        self._stop_requested = True
+
+    def dequeue_job_and_maintain_ttl(self, timeout, max_idle_time=None):
+        try:
+            fair_queue.release()
+        except Exception as e:
+            logger.warning(f"Could not release jobs from the fair queues: {e}")
+        return super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+
+
+_process = psutil.Process(os.getpid())
+
+
+def _over_budget(memory: Dict[str, int], jobs_done: int) -> Tuple[Optional[str], str]:
+    """
+    The first budget (rss, cuda_reserved or max_jobs) that has been passed, with a
+    description for the log, or (None, "") if the worker is within all of them.
+    """
+    rss_mb = memory["rss"] / 2**20
+    if settings.WORKER_MAX_RSS_MB > 0 and rss_mb > settings.WORKER_MAX_RSS_MB:
+        return "rss", f"RSS budget ({rss_mb:.0f} MB > {settings.WORKER_MAX_RSS_MB} MB)"
+    reserved_mb = memory.get("cuda_reserved", 0) / 2**20
+    if settings.WORKER_MAX_CUDA_RESERVED_MB > 0 and reserved_mb > settings.WORKER_MAX_CUDA_RESERVED_MB:
+        return "cuda_reserved", (
+            f"CUDA memory budget ({reserved_mb:.0f} MB > {settings.WORKER_MAX_CUDA_RESERVED_MB} MB)"
+        )
+    if settings.WORKER_MAX_JOBS > 0 and jobs_done >= settings.WORKER_MAX_JOBS:
+        return "max_jobs", f"job budget ({jobs_done} jobs)"
+    return None, ""
+
+
+def _start_up() -> Dict[str, float]:
+    """
+    Loads and warms up the model. Returns the seconds spent in each phase.
+    """
+    phases = {"interpreter": max(0.0, time.time() - _process.create_time())}
+
+    started = time.perf_counter()
+    # Load the model (and everything else the task needs) before taking any job.
+    from app.tasks import summarize_task
+    imported = time.perf_counter()
+    phases.update(summarize_task.COLD_START)
+    phases["imports"] = max(0.0, imported - started - sum(summarize_task.COLD_START.values()))
+
+    try:
+        warmups = summarize_task.warmup()
+    except Exception as e:
+        # A worker that cannot warm up still serves jobs, just slower at first.
+        logger.error(f"Model warmup failed: {e}", exc_info=True)
+        warmups = {}
+    phases["warmup"] = time.perf_counter() - imported
+
+    phases["total"] = phases["interpreter"] + (time.perf_counter() - started)
+    for phase, seconds in phases.items():
+        WORKER_COLD_START_SECONDS.labels(phase=phase).observe(seconds)
+    logger.info(
+        f"Worker ready after {phases['total']:.2f}s.",
+        extra={"cold_start": {key: round(value, 3) for key, value in {**phases, **warmups}.items()}},
+    )
+    return phases
+
+
+def main() -> None:
+    setup_logging()
+    worker = FairWorker([q], connection=redis_conn)
+    worker.cold_start = {phase: round(seconds, 3) for phase, seconds in _start_up().items()}
+    worker.work()
+    if worker.recycle_reason:
+        logger.info(f"Worker {worker.name} recycled after {worker.jobs_done} jobs ({worker.recycle_reason}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/common.py
+"""
+Shared helpers for the benchmark scripts.
+
+The application reads its configuration from the environment at import time,
+so every benchmark calls configure_env() before importing anything from 'app'.
+"""
+import json
+import os
+import statistics
+from typing import Dict, List
+
+BENCHMARK_ENV = {
+    "SECRET_KEY": "benchmark-secret-key",
+    "POSTGRES_USER": "benchmark",
+    "POSTGRES_PASSWORD": "benchmark",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "benchmark",
+    "DATABASE_URL": "sqlite:///./benchmark.db",
+    "REDIS_URL": "redis://localhost:6379/0",
+}
+
+
+def configure_env(**overrides: str) -> None:
+    """
+    Fills in the settings required by app.core.config without overriding
+    values that are already present in the environment.
+    """
+    for key, value in {**BENCHMARK_ENV, **overrides}.items():
+        os.environ.setdefault(key, value)
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    """
+    Returns p50/p95/p99 and mean of a list of latencies in milliseconds.
+    """
+    if not samples_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return round(ordered[index], 3)
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
+
+
+def dump_report(report: dict, output: str | None = None) -> None:
+    """
+    Writes a report as stable, key-sorted JSON to stdout or to a file.
+    """
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
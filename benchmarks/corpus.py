@@ -0,0 +1,66 @@
+# benchmarks/corpus.py
+"""
+A fixed, deterministic corpus of call-center style notes of varied length.
+
+The texts are assembled from a constant list of sentences, so every run (and every
+commit) benchmarks exactly the same inputs without downloading anything.
+"""
+from typing import Dict, List
+
+SENTENCES = [
+    "The customer called to report that their internet connection drops several times a day.",
+    "They have already restarted the router and checked all cables without any improvement.",
+    "The agent verified the account details and confirmed the service address.",
+    "A line test showed intermittent signal loss on the copper pair between the cabinet and the house.",
+    "The customer mentioned that they work from home and the outages interrupt video meetings.",
+    "The agent apologized for the inconvenience and explained the troubleshooting steps taken so far.",
+    "A technician visit was offered for the next available slot on Thursday morning.",
+    "The customer asked whether they would be compensated for the days without a stable connection.",
+    "The agent explained the service level agreement and applied a partial credit to the next invoice.",
+    "The customer also wanted to know if upgrading to fiber would solve the problem permanently.",
+    "The agent checked availability and confirmed that fiber is installed on the street since last month.",
+    "Pricing for the fiber plan was discussed, including the installation fee and contract length.",
+    "The customer decided to keep the technician appointment before committing to an upgrade.",
+    "A confirmation email with the appointment details and the ticket number was sent during the call.",
+    "The agent reminded the customer to keep the router powered on so remote diagnostics can run.",
+    "The call ended with the customer thanking the agent for the clear explanation.",
+    "Later that day the billing department reviewed the credit and approved it without changes.",
+    "The ticket was tagged as a recurring connectivity issue for follow-up by the network team.",
+]
+
+# Target lengths in characters; NoteCreate accepts 50 to 5000 characters.
+LENGTHS: Dict[str, int] = {
+    "short": 300,
+    "medium": 1500,
+    "long": 4900,
+}
+
+
+def build_text(length: int, offset: int = 0) -> str:
+    """
+    Concatenates sentences (starting at 'offset') until the text reaches 'length' characters.
+    """
+    parts: List[str] = []
+    total = 0
+    index = offset
+    while total < length:
+        sentence = SENTENCES[index % len(SENTENCES)]
+        parts.append(sentence)
+        total += len(sentence) + 1
+        index += 1
+    return " ".join(parts)[:length]
+
+
+def build_corpus(per_length: int = 4) -> List[Dict[str, str]]:
+    """
+    Returns 'per_length' texts for each length class, as {"id", "length_class", "text"} dicts.
+    """
+    corpus = []
+    for length_class, length in LENGTHS.items():
+        for i in range(per_length):
+            corpus.append({
+                "id": f"{length_class}-{i}",
+                "length_class": length_class,
+                "text": build_text(length, offset=i * 3),
+            })
+    return corpus
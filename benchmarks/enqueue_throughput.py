@@ -0,0 +1,139 @@
+# benchmarks/enqueue_throughput.py
+"""
+Throughput of enqueueing summarization jobs under concurrent submissions.
+
+--concurrency threads push --jobs jobs through fair_queue.enqueue_note() (job hash,
+owner sub-queue, release into RQ) with each of these Redis clients:
+
+    unpooled   Redis.from_url(REDIS_URL), as app/tasks/queue.py created it before
+               app/core/redis.py: an unbounded pool without timeouts
+    pooled     app.core.redis.create_client(): the shared BlockingConnectionPool
+               (REDIS_MAX_CONNECTIONS, timeouts, health checks)
+    pipelined  the pooled client, with jobs pushed in pipelines of OUTBOX_BATCH_SIZE
+               as the outbox dispatcher does
+
+and reports jobs per second, per-call latency and how many connections were opened.
+Needs a Redis database given explicitly with --redis-url, which must be empty (the jobs
+are flushed after each run); --fake uses an in-memory fakeredis server instead, which only
+exercises the client side.
+
+Usage:
+    python -m benchmarks.enqueue_throughput --redis-url redis://localhost:6379/15 --jobs 5000
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+configure_env()
+
+from redis import BlockingConnectionPool, ConnectionPool, Redis  # noqa: E402
+
+from app.core import redis as app_redis  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.tasks import fair_queue  # noqa: E402
+from app.tasks import queue as task_queue  # noqa: E402
+
+OWNERS = 50
+
+
+def _connections_opened(client: Redis) -> int:
+    pool = client.connection_pool
+    # redis-py keeps these counters private; the attribute differs per pool class.
+    if isinstance(pool, BlockingConnectionPool):
+        return len(pool._connections)
+    return pool._created_connections
+
+
+def _clients(redis_url: Optional[str]) -> dict:
+    if redis_url:
+        return {
+            "unpooled": lambda: Redis.from_url(redis_url),
+            "pooled": lambda: app_redis.create_client(redis_url),
+        }
+
+    import fakeredis
+    server = fakeredis.FakeServer()
+    options = {"connection_class": fakeredis.FakeConnection, "server": server}
+    return {
+        "unpooled": lambda: Redis(connection_pool=ConnectionPool(**options)),
+        "pooled": lambda: Redis(connection_pool=BlockingConnectionPool(
+            max_connections=settings.REDIS_MAX_CONNECTIONS, timeout=settings.REDIS_POOL_TIMEOUT_SECONDS, **options
+        )),
+    }
+
+
+def _run(client: Redis, jobs: int, concurrency: int, batch_size: int) -> dict:
+    task_queue.q.connection = client
+
+    def push(start: int) -> float:
+        started = time.perf_counter()
+        if batch_size == 1:
+            fair_queue.enqueue_note(start, owner_id=start % OWNERS)
+        else:
+            pipe = client.pipeline()
+            for note_id in range(start, min(start + batch_size, jobs)):
+                fair_queue.enqueue_note(note_id, owner_id=note_id % OWNERS, pipeline=pipe)
+            pipe.execute()
+            fair_queue.release()
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies: List[float] = list(pool.map(push, range(0, jobs, batch_size)))
+    elapsed = time.perf_counter() - started
+
+    queued = task_queue.q.count + fair_queue.backlog_size()
+    assert queued == jobs, f"expected {jobs} queued jobs, found {queued}"
+    return {
+        "jobs_per_second": round(jobs / elapsed, 1),
+        "call_latency_ms": percentiles(latencies),
+        "connections_opened": _connections_opened(client),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32, help="Threads submitting at the same time.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--redis-url", help="An empty Redis database to run against; it is flushed after each run.")
+    target.add_argument("--fake", action="store_true", help="Use an in-memory fakeredis server.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    if args.redis_url:
+        probe = Redis.from_url(args.redis_url)
+        try:
+            if probe.dbsize():
+                parser.error(f"{args.redis_url} is not empty; point --redis-url at an unused database.")
+        finally:
+            probe.close()
+
+    clients = _clients(None if args.fake else args.redis_url)
+    runs: dict[str, tuple[Callable[[], Redis], int]] = {
+        "unpooled": (clients["unpooled"], 1),
+        "pooled": (clients["pooled"], 1),
+        "pipelined": (clients["pooled"], settings.OUTBOX_BATCH_SIZE),
+    }
+    report = {
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "fake": args.fake,
+        "results": {},
+    }
+    for name, (make_client, batch_size) in runs.items():
+        client = make_client()
+        try:
+            report["results"][name] = _run(client, args.jobs, args.concurrency, batch_size)
+        finally:
+            client.flushdb()  # Only this run's jobs: the database was checked to be empty.
+            client.close()
+    dump_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
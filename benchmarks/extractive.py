@@ -0,0 +1,56 @@
+# benchmarks/extractive.py
+"""
+Latency of the extractive engine (app/tasks/extractive.py) on the benchmark corpus.
+
+For each length class, reports the per-note latency of summarizing notes one at a
+time, and of summarizing them in batches of --batch-size with summarize_batch().
+No model, GPU or network is needed.
+
+Usage:
+    python -m benchmarks.extractive --per-length 32 --batch-size 16 --repeat 20
+"""
+import argparse
+import time
+from typing import Callable, List
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+configure_env()
+
+from app.tasks import extractive  # noqa: E402
+from benchmarks.corpus import LENGTHS, build_corpus  # noqa: E402
+
+
+def _measure(func: Callable[[List[str]], List[str]], texts: List[str], batch_size: int, repeat: int) -> dict:
+    func(texts[:batch_size])  # warm up
+    samples = []
+    for _ in range(repeat):
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            started = time.perf_counter()
+            func(batch)
+            samples.append((time.perf_counter() - started) * 1000 / len(batch))
+    return {"per_note_latency_ms": percentiles(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-length", type=int, default=32, help="Notes per length class.")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.per_length)
+    report = {"per_length": args.per_length, "batch_size": args.batch_size, "repeat": args.repeat, "results": {}}
+    for length_class in LENGTHS:
+        texts = [item["text"] for item in corpus if item["length_class"] == length_class]
+        report["results"][length_class] = {
+            "single": _measure(lambda batch: [extractive.summarize(text) for text in batch], texts, 1, args.repeat),
+            "batched": _measure(extractive.summarize_batch, texts, args.batch_size, args.repeat),
+        }
+    dump_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
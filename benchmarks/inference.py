@@ -0,0 +1,179 @@
+# benchmarks/inference.py
+"""
+Offline inference benchmark over the bundled model (model_cache/).
+
+Runs app.tasks.summarize_task.summarize_batch, the same code path the worker
+uses, over the fixed corpus in benchmarks/corpus.py. It sweeps batch size, beam
+count, torch thread count and max input length, and reports throughput,
+p50/p95/p99 batch latency, tokens/s and peak RSS as key-sorted JSON.
+
+Usage:
+    python -m benchmarks.inference run --batch-sizes 1,4 --beams 1,4 --threads 1,4 \\
+        --max-input-lengths 512,1024 --output bench.json
+    python -m benchmarks.inference compare old.json new.json --tolerance 0.10
+
+Nothing is downloaded: HF_HUB_OFFLINE/TRANSFORMERS_OFFLINE are forced on and the
+model is read from MODEL_CACHE_DIR (default: the repository's model_cache/).
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+os.environ["HF_HUB_OFFLINE"] = "1"
+os.environ["TRANSFORMERS_OFFLINE"] = "1"
+configure_env(MODEL_CACHE_DIR=str(REPO_ROOT / "model_cache"))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _run_config(summarize_task, corpus, *, batch_size: int, beams: int, max_input_length: int, repeat: int, warmup: int) -> Dict:
+    texts = [item["text"] for item in corpus]
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    for batch in batches[:warmup]:
+        summarize_task.summarize_batch(batch, num_beams=beams, max_input_length=max_input_length)
+
+    latencies_ms = []
+    input_tokens = output_tokens = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for batch in batches:
+            batch_started = time.perf_counter()
+            _, stats = summarize_task.summarize_batch(batch, num_beams=beams, max_input_length=max_input_length)
+            latencies_ms.append((time.perf_counter() - batch_started) * 1000)
+            input_tokens += stats["input_tokens"]
+            output_tokens += stats["output_tokens"]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "texts": len(texts) * repeat,
+        "throughput_texts_per_s": round(len(texts) * repeat / elapsed, 3),
+        "batch_latency_ms": percentiles(latencies_ms),
+        "input_tokens_per_s": round(input_tokens / elapsed, 1),
+        "output_tokens_per_s": round(output_tokens / elapsed, 1),
+        # Peak RSS of the process so far; the sweep runs configs in a fixed order.
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run(args) -> None:
+    import torch
+    import transformers
+
+    from benchmarks.corpus import build_corpus
+    from app.tasks import summarize_task
+
+    if summarize_task.model is None or summarize_task.tokenizer is None:
+        sys.exit(f"Model could not be loaded from {os.environ['MODEL_CACHE_DIR']}.")
+
+    corpus = build_corpus(per_length=args.per_length)
+    results = []
+    for batch_size, beams, threads, max_input_length in itertools.product(
+        args.batch_sizes, args.beams, args.threads, args.max_input_lengths
+    ):
+        torch.set_num_threads(threads)
+        key = f"batch={batch_size},beams={beams},threads={threads},max_input={max_input_length}"
+        print(f"running {key}", file=sys.stderr)
+        result = _run_config(
+            summarize_task,
+            corpus,
+            batch_size=batch_size,
+            beams=beams,
+            max_input_length=max_input_length,
+            repeat=args.repeat,
+            warmup=args.warmup,
+        )
+        results.append({
+            "config": {"batch_size": batch_size, "beams": beams, "threads": threads, "max_input_length": max_input_length},
+            "key": key,
+            **result,
+        })
+
+    dump_report(
+        {
+            "environment": {
+                "python": platform.python_version(),
+                "torch": torch.__version__,
+                "transformers": transformers.__version__,
+                "cpu_count": os.cpu_count(),
+                "machine": platform.machine(),
+            },
+            "corpus": {"texts": len(corpus), "per_length": args.per_length},
+            "repeat": args.repeat,
+            "results": sorted(results, key=lambda r: r["key"]),
+        },
+        args.output,
+    )
+
+
+def compare(args) -> None:
+    """
+    Compares two reports config by config. Exits with status 1 if throughput dropped
+    or p95 latency grew by more than the tolerance for any config present in both.
+    """
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = {r["key"]: r for r in json.load(fh)["results"]}
+    with open(args.candidate, encoding="utf-8") as fh:
+        candidate = {r["key"]: r for r in json.load(fh)["results"]}
+
+    regressions = []
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        throughput_change = new["throughput_texts_per_s"] / old["throughput_texts_per_s"] - 1
+        p95_change = new["batch_latency_ms"]["p95"] / old["batch_latency_ms"]["p95"] - 1
+        rows.append({"key": key, "throughput_change": round(throughput_change, 4), "p95_change": round(p95_change, 4)})
+        if throughput_change < -args.tolerance or p95_change > args.tolerance:
+            regressions.append(key)
+
+    dump_report({"tolerance": args.tolerance, "comparisons": rows, "regressions": regressions})
+    if regressions:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark sweep.")
+    run_parser.add_argument("--batch-sizes", type=_int_list, default=[1, 4])
+    run_parser.add_argument("--beams", type=_int_list, default=[4])
+    run_parser.add_argument("--threads", type=_int_list, default=[os.cpu_count() or 1])
+    run_parser.add_argument("--max-input-lengths", type=_int_list, default=[1024])
+    run_parser.add_argument("--per-length", type=int, default=4, help="Texts per length class in the corpus.")
+    run_parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per config.")
+    run_parser.add_argument("--warmup", type=int, default=1, help="Untimed batches before each config.")
+    run_parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two reports.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--tolerance", type=float, default=0.10)
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# benchmarks/loadtest.py
+"""
+End-to-end API load test with local stand-ins.
+
+Boots app.main:app in-process against SQLite (or any DATABASE_URL, e.g. a
+temporary local Postgres), a fakeredis queue, the outbox dispatcher and a stub
+summarizer that completes queued notes after a fixed delay. Concurrent async
+clients then register, log in and run a weighted mix of create / poll / list
+traffic.
+
+The report has per-endpoint throughput, latency percentiles, status codes and
+SQL statements per request, so regressions such as N+1 queries or blocking
+calls on the event loop show up before deploy.
+
+Usage:
+    python -m benchmarks.loadtest --users 20 --duration 30 --output load.json
+    python -m benchmarks.loadtest --database-url postgresql://user:pw@localhost/loadtest
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="Number of concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of mixed traffic after login.")
+    parser.add_argument("--mix", default="create=1,poll=6,list=2", help="Relative weights of the traffic mix.")
+    parser.add_argument("--think-time-ms", type=float, default=50.0, help="Pause between a user's requests.")
+    parser.add_argument("--stub-latency-ms", type=float, default=200.0, help="Time the stub summarizer takes per note.")
+    parser.add_argument("--database-url", help="Database to use instead of a temporary SQLite file.")
+    parser.add_argument("--bcrypt-rounds", default="4", help="Lower bcrypt cost so logins don't dominate the run.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    return parser.parse_args()
+
+
+class Recorder:
+    """
+    Collects per-endpoint latencies, status codes and SQL statement counts.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.queries_by_request: Dict[str, int] = defaultdict(int)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+
+    def record(self, endpoint: str, request_id: str, status_code: int, elapsed_ms: float) -> None:
+        self.latencies[endpoint].append(elapsed_ms)
+        self.statuses[endpoint][status_code] += 1
+        self.queries[endpoint].append(self.queries_by_request.pop(request_id, 0))
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            queries = self.queries[endpoint]
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "latency_ms": percentiles(samples),
+                "status_codes": {str(code): count for code, count in sorted(self.statuses[endpoint].items())},
+                "sql_statements_per_request": {
+                    "mean": round(sum(queries) / len(queries), 2) if queries else 0.0,
+                    "max": max(queries) if queries else 0,
+                },
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        return {"total_requests": total, "throughput_rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+async def _stub_summarizer(queue, session_factory, latency_s: float, stop: asyncio.Event) -> int:
+    """
+    Drains the outbox like the dispatcher and the fake queue like a worker would,
+    marking each note DONE after 'latency_s'.
+    """
+    from app.crud.note import claim_note, get_note, update_note
+    from app.models.note import NoteStatus
+    from app.tasks import fair_queue
+    from app.tasks.admission import record_completion
+    from app.tasks.dispatcher import dispatch_batch
+
+    def dispatch() -> None:
+        db = session_factory()
+        try:
+            dispatch_batch(db)
+        finally:
+            db.close()
+
+    def complete(note_id: int) -> None:
+        db = session_factory()
+        try:
+            if claim_note(db, note_id=note_id):
+                note = get_note(db, note_id=note_id)
+                time.sleep(latency_s)
+                update_note(db, db_note=note, note_in={
+                    "status": NoteStatus.DONE,
+                    "summary": "Stub summary.",
+                    "processing_time_ms": latency_s * 1000,
+                })
+        finally:
+            db.close()
+
+    processed = 0
+    while not stop.is_set():
+        await asyncio.to_thread(dispatch)
+        fair_queue.release()
+        job_ids = queue.get_job_ids(0, 1)
+        if not job_ids:
+            await asyncio.sleep(0.01)
+            continue
+        job = queue.fetch_job(job_ids[0])
+        queue.remove(job_ids[0])
+        if job is not None:
+            await asyncio.to_thread(complete, job.args[0])
+            record_completion()
+            processed += 1
+    return processed
+
+
+async def _virtual_user(client, recorder: Recorder, rng: random.Random, mix: Dict[str, int], deadline: float, think_s: float) -> None:
+    async def call(endpoint: str, method: str, url: str, **kwargs):
+        request_id = uuid.uuid4().hex
+        headers = {**kwargs.pop("headers", {}), "X-Request-ID": request_id}
+        started = time.perf_counter()
+        response = await client.request(method, url, headers=headers, **kwargs)
+        recorder.record(endpoint, request_id, response.status_code, (time.perf_counter() - started) * 1000)
+        return response
+
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    password = "load-test-password"
+    await call("register", "POST", "/api/v1/auth/register", json={"email": email, "password": password})
+    response = await call("login", "POST", "/api/v1/auth/login", data={"username": email, "password": password})
+    if response.status_code != 200:
+        return
+    auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    note_ids: List[int] = []
+    etags: Dict[int, str] = {}
+    actions, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        action = rng.choices(actions, weights)[0]
+        if action == "create" or (action == "poll" and not note_ids):
+            text = " ".join(rng.choice(["billing", "refund", "router", "outage", "upgrade", "invoice"]) for _ in range(60))
+            response = await call("create", "POST", "/api/v1/notes/", json={"raw_text": text}, headers=auth)
+            if response.status_code == 201:
+                note_ids.append(response.json()["id"])
+        elif action == "poll":
+            note_id = rng.choice(note_ids)
+            headers = dict(auth)
+            if note_id in etags:
+                headers["If-None-Match"] = etags[note_id]
+            response = await call("poll", "GET", f"/api/v1/notes/{note_id}", headers=headers)
+            if "etag" in response.headers:
+                etags[note_id] = response.headers["etag"]
+        else:
+            await call("list", "GET", "/api/v1/notes/", params={"limit": 20}, headers=auth)
+        await asyncio.sleep(think_s)
+
+
+async def _main(args) -> Dict:
+    import fakeredis
+    import httpx
+    from sqlalchemy import event
+
+    from app.core import security
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.logger import get_request_id
+    from app.main import app
+    from app.tasks import queue as task_queue
+
+    # Swap the queue's Redis connection for an in-memory fake.
+    fake_redis = fakeredis.FakeRedis()
+    task_queue.redis_conn = fake_redis
+    task_queue.q.connection = fake_redis
+
+    Base.metadata.create_all(bind=engine)
+    recorder = Recorder()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_):
+        request_id = get_request_id()
+        if request_id:
+            recorder.queries_by_request[request_id] += 1
+
+    mix = {name: int(weight) for name, weight in (pair.split("=") for pair in args.mix.split(","))}
+    rng = random.Random(args.seed)
+    security.start_password_executor()
+    stop = asyncio.Event()
+    summarizer = asyncio.create_task(_stub_summarizer(task_queue.q, SessionLocal, args.stub_latency_ms / 1000, stop))
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(
+                _virtual_user(client, recorder, random.Random(rng.random()), mix, deadline, args.think_time_ms / 1000)
+                for _ in range(args.users)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        processed = await summarizer
+        security.shutdown_password_executor()
+
+    report = recorder.report(elapsed)
+    report.update({
+        "users": args.users,
+        "duration_s": args.duration,
+        "mix": mix,
+        "stub_latency_ms": args.stub_latency_ms,
+        "notes_summarized": processed,
+        "database": engine.dialect.name,
+    })
+    return report
+
+
+def main() -> None:
+    args = _parse_args()
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    # Never fall back to a DATABASE_URL inherited from the environment.
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    os.environ["BCRYPT_ROUNDS"] = args.bcrypt_rounds
+    os.environ["LOG_LEVEL"] = "WARNING"
+    configure_env()
+    dump_report(asyncio.run(_main(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/login_throughput.py
+"""
+Login throughput benchmark.
+
+Compares verifying bcrypt hashes inline on a threadpool (the old login path)
+with verifying them on the password hashing process pool, and measures how
+long an unrelated, cheap threadpool task waits while the login storm runs.
+
+Usage:
+    python -m benchmarks.login_throughput --logins 200 --concurrency 40
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+configure_env()
+
+from app.core import security  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def _probe_latencies(loop: asyncio.AbstractEventLoop, threadpool: ThreadPoolExecutor, stop: asyncio.Event):
+    """
+    Schedules a trivial threadpool task every 10 ms and records how long each one took.
+    """
+    samples = []
+
+    async def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await loop.run_in_executor(threadpool, lambda: None)
+            samples.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.01)
+
+    return samples, probe()
+
+
+async def _run(mode: str, hashed: str, logins: int, concurrency: int, threads: int) -> dict:
+    loop = asyncio.get_running_loop()
+    threadpool = ThreadPoolExecutor(max_workers=threads)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if mode == "inline":
+                    await loop.run_in_executor(threadpool, security.verify_password, PASSWORD, hashed)
+                else:
+                    await security.verify_password_async(PASSWORD, hashed)
+            except Exception:
+                rejected += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    stop = asyncio.Event()
+    probe_samples, probe = _probe_latencies(loop, threadpool, stop)
+    probe_task = asyncio.create_task(probe)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    threadpool.shutdown(wait=True)
+
+    return {
+        "logins_per_second": round(len(latencies) / elapsed, 2),
+        "login_latency_ms": percentiles(latencies),
+        "rejected": rejected,
+        "unrelated_task_latency_ms": percentiles(probe_samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=40, help="Size of the request threadpool (AnyIO default: 40).")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    hashed = security.get_password_hash(PASSWORD)
+    security.start_password_executor()
+    try:
+        report = {
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+            "logins": args.logins,
+            "concurrency": args.concurrency,
+            "inline": asyncio.run(_run("inline", hashed, args.logins, args.concurrency, args.threads)),
+            "process_pool": asyncio.run(_run("process_pool", hashed, args.logins, args.concurrency, args.threads)),
+        }
+    finally:
+        security.shutdown_password_executor()
+    dump_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
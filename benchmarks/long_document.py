@@ -0,0 +1,99 @@
+# benchmarks/long_document.py
+"""
+Latency against document length for long-input summarization.
+
+For each document length (in characters, built from benchmarks/corpus.py) it runs:
+
+- truncate: one summarize_batch() call, which drops everything past
+  SUMMARY_MAX_INPUT_TOKENS tokens (the behavior without chunking)
+- chunked: summarize_long(), the map-reduce path the worker uses for long inputs
+
+and reports p50/p95 latency, input tokens, chunks and map passes per length.
+
+Usage:
+    python -m benchmarks.long_document --lengths 4000,8000,16000,32000 \\
+        --chunk-tokens 512 --overlap 1 --repeat 3 --output long.json
+
+Like benchmarks.inference, nothing is downloaded: the model is read from
+MODEL_CACHE_DIR (default: the repository's model_cache/).
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+os.environ["HF_HUB_OFFLINE"] = "1"
+os.environ["TRANSFORMERS_OFFLINE"] = "1"
+configure_env(MODEL_CACHE_DIR=str(REPO_ROOT / "model_cache"))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=_int_list, default=[2000, 4000, 8000, 16000, 32000])
+    parser.add_argument("--chunk-tokens", type=int, help="Override SUMMARY_CHUNK_TOKENS.")
+    parser.add_argument("--overlap", type=int, help="Override SUMMARY_CHUNK_OVERLAP_SENTENCES.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.tasks import summarize_task
+    from benchmarks.corpus import build_text
+
+    if summarize_task.model is None or summarize_task.tokenizer is None:
+        sys.exit(f"Model could not be loaded from {os.environ['MODEL_CACHE_DIR']}.")
+    if args.chunk_tokens:
+        settings.SUMMARY_CHUNK_TOKENS = args.chunk_tokens
+    if args.overlap is not None:
+        settings.SUMMARY_CHUNK_OVERLAP_SENTENCES = args.overlap
+
+    summarize_task.summarize_batch([build_text(500)])  # warm up
+    results = []
+    for length in args.lengths:
+        text = build_text(length)
+        print(f"running length={length}", file=sys.stderr)
+        truncate_ms, chunked_ms = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            summarize_task.summarize_batch([text])
+            truncate_ms.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            _, stats = summarize_task.summarize_long(text)
+            chunked_ms.append((time.perf_counter() - started) * 1000)
+
+        results.append({
+            "length_chars": length,
+            "input_tokens": summarize_task.count_tokens(text),
+            "truncate": {"latency_ms": percentiles(truncate_ms)},
+            "chunked": {
+                "latency_ms": percentiles(chunked_ms),
+                "chunks": stats["chunks"],
+                "map_passes": stats["map_passes"],
+            },
+        })
+
+    dump_report(
+        {
+            "max_input_tokens": settings.SUMMARY_MAX_INPUT_TOKENS,
+            "chunk_tokens": settings.SUMMARY_CHUNK_TOKENS,
+            "overlap_sentences": settings.SUMMARY_CHUNK_OVERLAP_SENTENCES,
+            "repeat": args.repeat,
+            "results": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/serialization.py
+"""
+Micro-benchmark of serializing a page of 100 NotePublic objects.
+
+- before: FastAPI's default path for 'response_model' (validate, dump to JSON-mode
+  python, jsonable_encoder, rendered by JSONResponse)
+- orjson_response: the same dict round trip rendered by ORJSONResponse (only if
+  orjson is installed; it is not a dependency of the app)
+- after: app.core.responses.model_response (validate, pydantic-core dump_json)
+
+'before' and 'after' produce the same bytes (tests/test_responses.py checks this
+against a real endpoint). ORJSONResponse only speeds up the final render, and the
+note endpoints, whose bodies are large, bypass the response class altogether, so
+the app keeps FastAPI's default response class.
+
+Usage:
+    python -m benchmarks.serialization --notes 100 --repeat 200
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, List
+
+from benchmarks.common import configure_env, dump_report, percentiles
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+configure_env()
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.responses import model_response  # noqa: E402
+from app.models.note import NoteStatus  # noqa: E402
+from app.schemas.note import NotePublic  # noqa: E402
+
+note_list_adapter = TypeAdapter(List[NotePublic])
+
+
+def _fake_notes(count: int) -> list:
+    """
+    Builds ORM-like objects with a 5 KB raw_text, as the list endpoint sees them.
+    """
+    owner = SimpleNamespace(id=1, email="agent@example.com")
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=i,
+            status=NoteStatus.DONE,
+            raw_text=("Customer called about a billing issue. " * 128)[:5000],
+            summary="Customer called about a billing issue and asked for a refund.",
+            failure_reason=None,
+            processing_time_ms=812.5,
+            created_at=created_at,
+            owner=owner,
+        )
+        for i in range(count)
+    ]
+
+
+def _response_content(notes):
+    # What fastapi.routing.serialize_response does with a 'response_model'.
+    validated = note_list_adapter.validate_python(notes, from_attributes=True)
+    return jsonable_encoder(note_list_adapter.dump_python(validated, mode="json"))
+
+
+def _before(notes) -> bytes:
+    return JSONResponse(_response_content(notes)).body
+
+
+def _orjson_response(notes) -> bytes:
+    return ORJSONResponse(_response_content(notes)).body
+
+
+def _after(notes) -> bytes:
+    return model_response(note_list_adapter, notes).body
+
+
+def _measure(func: Callable, notes, repeat: int) -> dict:
+    func(notes)  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(notes)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"latency_ms": percentiles(samples), "bytes": len(body)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    notes = _fake_notes(args.notes)
+    report = {
+        "notes": args.notes,
+        "repeat": args.repeat,
+        "before": _measure(_before, notes, args.repeat),
+    }
+    if orjson is not None:
+        report["orjson_response"] = _measure(_orjson_response, notes, args.repeat)
+    report["after"] = _measure(_after, notes, args.repeat)
+    dump_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ tokenizer = T5Tokenizer.from_pretrained(model_name)
 model = T5ForConditionalGeneration.from_pretrained(model_name)
 
 tokenizer.save_pretrained(output_dir)
-model.save_pretrained(output_dir)
+# Safetensors can be memory-mapped by the workers at start-up (see app/tasks/summarize_task.py).
+model.save_pretrained(output_dir, safe_serialization=True)
 
 print("Model download and save complete.")
\ No newline at end of file
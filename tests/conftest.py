@@ -0,0 +1,80 @@
+# tests/conftest.py
+"""
+Shared fixtures. The tests run against a throwaway SQLite database and an in-memory
+fakeredis server (with Lua support, for the fair-queue scripts), so neither
+PostgreSQL nor Redis is needed.
+"""
+import os
+import tempfile
+
+# app.core.config reads its settings at import time.
+_DB_DIR = tempfile.mkdtemp(prefix="summarizer-tests-")
+for _key, _value in {
+    "SECRET_KEY": "test-secret-key",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "DATABASE_URL": f"sqlite:///{_DB_DIR}/test.db",
+    "REDIS_URL": "redis://localhost:6379/15",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.crud import note as crud_note  # noqa: E402
+from app.models import note as _note_models  # noqa: E402,F401
+from app.models.user import User, UserRole  # noqa: E402
+from app.schemas.note import NoteCreate  # noqa: E402
+from app.tasks import queue as task_queue  # noqa: E402
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """
+    A fresh fakeredis client, used as the connection of the RQ queue.
+    """
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(task_queue, "redis_conn", client)
+    monkeypatch.setattr(task_queue.q, "connection", client)
+    yield client
+    client.flushall()
+
+
+@pytest.fixture
+def db():
+    """
+    A session on an empty database; the tables are dropped afterwards.
+    """
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def make_user(db):
+    def make(email: str = "agent@example.com", role: UserRole = UserRole.AGENT) -> User:
+        user = User(email=email, hashed_password="not-a-hash", role=role)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_note(db):
+    """
+    Creates a QUEUED note (and its outbox row) through crud.create_note.
+    """
+    def make(owner: User, **fields):
+        note_in = NoteCreate(raw_text="A note that is long enough to pass the length validation.", **fields)
+        return crud_note.create_note(db, note_in=note_in, owner_id=owner.id)
+    return make
@@ -0,0 +1,88 @@
+# tests/test_admission.py
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.tasks import admission
+from app.tasks.admission import COMPLETIONS_KEY_PREFIX, QueueState, enforce_admission, get_queue_state
+from app.tasks.queue import q
+
+# 30 seconds into an epoch minute.
+NOW = 28_000_000 * 60 + 30.0
+MINUTE = int(NOW // 60)
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(admission, "time", SimpleNamespace(time=lambda: NOW))
+
+
+def _queue_jobs(redis, count: int) -> None:
+    for index in range(count):
+        redis.rpush(q.key, f"job-{index}")
+
+
+def _completions(redis, minutes_ago: int, count: int) -> None:
+    redis.set(f"{COMPLETIONS_KEY_PREFIX}{MINUTE - minutes_ago}", count)
+
+
+def test_empty_queue_has_no_wait(redis):
+    assert get_queue_state().estimated_wait_seconds == 0.0
+
+
+def test_depth_counts_ready_jobs_and_fair_queue_backlog(redis):
+    _queue_jobs(redis, 3)
+    redis.set("fairq:size", 4)
+    assert get_queue_state().depth == 7
+
+
+def test_single_completion_after_cold_start_uses_fallback(redis):
+    # One job finished a few seconds ago: measured over the full window that would be
+    # 1/330 jobs/s and a 20 minute wait for 4 jobs.
+    _queue_jobs(redis, 4)
+    _completions(redis, 0, 1)
+
+    state = get_queue_state()
+    assert state.jobs_per_second == 0.0
+    assert state.estimated_wait_seconds == 4 * settings.ADMISSION_FALLBACK_SECONDS_PER_JOB
+
+
+def test_rate_is_measured_from_the_oldest_busy_minute(redis):
+    # Workers started a minute ago after an idle period: 90 jobs over the last 90 seconds.
+    _queue_jobs(redis, 10)
+    _completions(redis, 1, 60)
+    _completions(redis, 0, 30)
+
+    state = get_queue_state()
+    assert state.jobs_per_second == pytest.approx(1.0)
+    assert state.estimated_wait_seconds == pytest.approx(10.0)
+
+
+def test_completions_outside_the_window_are_ignored(redis):
+    _completions(redis, settings.ADMISSION_THROUGHPUT_WINDOW_MINUTES + 1, 1000)
+    assert get_queue_state().jobs_per_second == 0.0
+
+
+def test_small_queue_is_admitted_after_a_cold_start(redis):
+    _queue_jobs(redis, 4)
+    _completions(redis, 0, 1)
+    enforce_admission(db=None, user=None)
+
+
+def test_long_backlog_is_rejected_with_retry_after(redis, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_WAIT_SECONDS", 60)
+    monkeypatch.setattr(settings, "USER_MAX_PENDING_NOTES", 0)
+    _queue_jobs(redis, 100)
+    _completions(redis, 0, 30)  # 1 job/s
+
+    with pytest.raises(HTTPException) as error:
+        enforce_admission(db=None, user=None)
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "40"
+
+
+def test_seconds_to_drain_falls_back_without_throughput():
+    state = QueueState(depth=10, jobs_per_second=0.0)
+    assert state.seconds_to_drain(3) == 3 * settings.ADMISSION_FALLBACK_SECONDS_PER_JOB
@@ -0,0 +1,116 @@
+# tests/test_cache.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import cache
+from app.core.cache import INVALIDATE_CHANNEL, LRUCache
+from app.core.database import SessionLocal
+from app.crud.note import claim_note, finish_note, get_note
+from app.models.note import Note, NoteStatus
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.fixture(autouse=True)
+def empty_local_tier():
+    cache.clear_local()
+    yield
+    cache.clear_local()
+
+
+def _finished_note(db, make_user, make_note, status=NoteStatus.DONE) -> Note:
+    note = make_note(make_user())
+    assert claim_note(db, note_id=note.id)
+    return finish_note(db, note_id=note.id, values={"status": status, "summary": "A summary."})
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# LRUCache
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+def test_least_recently_used_entry_is_evicted(clock):
+    lru = LRUCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1  # "b" is now the least recently used
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+
+def test_entries_expire_after_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("a", 1)
+    clock.value += 59
+    assert lru.get("a") == 1
+    clock.value += 2
+    assert lru.get("a") is None
+
+
+def test_zero_size_disables_the_cache(clock):
+    lru = LRUCache(maxsize=0, ttl=60)
+    lru.set("a", 1)
+    assert lru.get("a") is None
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Finished note responses
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+@pytest.mark.parametrize("status", [NoteStatus.DONE, NoteStatus.FAILED])
+def test_finished_notes_are_cached_in_both_tiers(db, redis, make_user, make_note, status):
+    note = _finished_note(db, make_user, make_note, status)
+    cached = cache.store_note(db, note=note)
+
+    assert cached is not None
+    assert json.loads(cached.body)["status"] == status.value
+    assert redis.exists(f"{cache.REDIS_KEY_PREFIX}{note.id}")
+    cache.clear_local()
+    assert cache.get_note(note.id) == cached
+
+
+@pytest.mark.parametrize("status", [NoteStatus.QUEUED, NoteStatus.PROCESSING])
+def test_unfinished_notes_are_not_cached(db, redis, make_user, make_note, status):
+    note = make_note(make_user())
+    if status == NoteStatus.PROCESSING:
+        claim_note(db, note_id=note.id)
+    note = get_note(db, note_id=note.id)
+
+    assert cache.store_note(db, note=note) is None
+    assert cache.get_note(note.id) is None
+    assert not redis.exists(f"{cache.REDIS_KEY_PREFIX}{note.id}")
+
+
+def test_note_changed_since_it_was_loaded_is_not_cached(db, redis, make_user, make_note):
+    note = _finished_note(db, make_user, make_note)
+    # Another process requeues the note after this reader loaded it.
+    other = SessionLocal()
+    other.query(Note).filter(Note.id == note.id).update({"status": NoteStatus.QUEUED})
+    other.commit()
+    other.close()
+
+    assert cache.store_note(db, note=note) is None
+    assert cache.get_note(note.id) is None
+    assert not redis.exists(f"{cache.REDIS_KEY_PREFIX}{note.id}")
+
+
+def test_invalidation_is_broadcast(db, redis, make_user, make_note):
+    note = _finished_note(db, make_user, make_note)
+    cache.store_note(db, note=note)
+    pubsub = redis.pubsub()
+    pubsub.subscribe(INVALIDATE_CHANNEL)
+    pubsub.get_message(timeout=1)  # the subscribe confirmation
+
+    cache.invalidate_notes([note.id])
+
+    assert cache.get_note(note.id) is None
+    message = pubsub.get_message(timeout=1)
+    assert message["data"] == str(note.id).encode()
@@ -0,0 +1,124 @@
+# tests/test_conditional_get.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import cache
+from app.core.dependencies import get_current_active_user
+from app.core.responses import etag_matches, version_headers
+from app.crud.note import claim_note, finish_note
+from app.main import app
+from app.models.note import NoteStatus
+
+CREATED = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _row(note_id=1, status=NoteStatus.DONE, updated_at=None):
+    return SimpleNamespace(id=note_id, status=status, created_at=CREATED, updated_at=updated_at)
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Validators
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+def test_same_rows_give_the_same_etag():
+    assert version_headers([_row(), _row(2)]) == version_headers([_row(), _row(2)])
+
+
+@pytest.mark.parametrize("changed", [
+    _row(status=NoteStatus.FAILED),
+    _row(updated_at=CREATED + timedelta(seconds=1)),
+    _row(note_id=2),
+])
+def test_any_version_change_gives_a_new_etag(changed):
+    assert version_headers([changed])["ETag"] != version_headers([_row()])["ETag"]
+
+
+def test_last_modified_is_the_latest_row():
+    headers = version_headers([_row(updated_at=CREATED + timedelta(hours=1)), _row(2)])
+    assert headers["Last-Modified"] == "Wed, 01 Jan 2025 13:00:00 GMT"
+    assert headers["ETag"].startswith('W/"')
+
+
+def test_naive_datetimes_are_utc():
+    naive = SimpleNamespace(id=1, status=NoteStatus.DONE, created_at=CREATED.replace(tzinfo=None), updated_at=None)
+    assert version_headers([naive])["Last-Modified"] == version_headers([_row()])["Last-Modified"]
+
+
+def test_empty_page_has_an_etag_but_no_last_modified():
+    headers = version_headers([])
+    assert "ETag" in headers and "Last-Modified" not in headers
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('W/"abc"', True),
+    ('"abc"', True),  # weak comparison ignores the W/ prefix
+    ('"other", W/"abc"', True),
+    ('"other"', False),
+])
+def test_etag_matching(if_none_match, matches):
+    assert etag_matches(if_none_match, 'W/"abc"') is matches
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Endpoints
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+@pytest.fixture
+def agent(db, redis, make_user):
+    user = make_user()
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    cache.clear_local()
+    yield user
+    app.dependency_overrides.pop(get_current_active_user, None)
+    cache.clear_local()
+
+
+@pytest.fixture
+def client():
+    # Without a context manager, so the lifespan (process pool, Redis listener) does not run.
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("finished", [False, True])
+def test_unchanged_note_is_not_modified(db, agent, make_note, client, finished):
+    note = make_note(agent)
+    if finished:  # served from the note cache after the first request
+        claim_note(db, note_id=note.id)
+        finish_note(db, note_id=note.id, values={"status": NoteStatus.DONE, "summary": "A summary."})
+
+    first = client.get(f"/api/v1/notes/{note.id}")
+    again = client.get(f"/api/v1/notes/{note.id}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+def test_changed_note_is_sent_again(db, agent, make_note, client):
+    note = make_note(agent)
+    etag = client.get(f"/api/v1/notes/{note.id}").headers["ETag"]
+    claim_note(db, note_id=note.id)
+
+    response = client.get(f"/api/v1/notes/{note.id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == NoteStatus.PROCESSING.value
+    assert response.headers["ETag"] != etag
+
+
+def test_unchanged_page_is_not_modified(db, agent, make_note, client):
+    make_note(agent)
+    make_note(agent)
+    first = client.get("/api/v1/notes/")
+    assert len(first.json()) == 2
+
+    assert client.get("/api/v1/notes/", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    make_note(agent)
+    assert client.get("/api/v1/notes/", headers={"If-None-Match": first.headers["ETag"]}).status_code == 200
@@ -0,0 +1,119 @@
+# tests/test_dispatcher.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.crud import note as crud_note
+from app.models.note import Note, NoteOutbox, NoteStatus
+from app.tasks import dispatcher, fair_queue, note_events
+from app.tasks.queue import q
+
+
+def _queued_job_ids(redis):
+    ready = [job_id.decode() for job_id in redis.lrange(q.key, 0, -1)]
+    waiting = [
+        job_id.decode()
+        for owner_id in fair_queue.owner_backlogs()
+        for job_id in redis.lrange(fair_queue._owner_key(owner_id), 0, -1)
+    ]
+    return ready + waiting
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(note_events, "publish_status", lambda note_id, status: events.append((note_id, status)))
+    return events
+
+
+def _make_stuck(db, note, *, status=NoteStatus.PROCESSING, attempts=0):
+    """
+    Turns a note into one the reconciler picks up: no outbox row, no live job, unchanged
+    for longer than RECONCILE_STUCK_AFTER_SECONDS.
+    """
+    db.query(NoteOutbox).filter(NoteOutbox.note_id == note.id).delete()
+    db.query(Note).filter(Note.id == note.id).update({
+        "status": status,
+        "enqueue_attempts": attempts,
+        "updated_at": datetime.now(timezone.utc) - timedelta(seconds=settings.RECONCILE_STUCK_AFTER_SECONDS + 60),
+    })
+    db.commit()
+
+
+def test_dispatch_pushes_outbox_rows_and_records_job_ids(db, redis, make_user, make_note):
+    owner = make_user()
+    notes = [make_note(owner) for _ in range(3)]
+
+    assert dispatcher.dispatch_batch(db) == 3
+    assert db.query(NoteOutbox).count() == 0
+
+    job_ids = sorted(_queued_job_ids(redis))
+    db.expire_all()
+    assert job_ids == sorted(crud_note.get_note(db, note_id=note.id).job_id for note in notes)
+    assert all(crud_note.get_note(db, note_id=note.id).enqueue_attempts == 1 for note in notes)
+    assert dispatcher.dispatch_batch(db) == 0
+
+
+def test_dispatch_after_a_crash_does_not_push_jobs_twice(db, redis, make_user, make_note, monkeypatch):
+    owner = make_user()
+    for _ in range(3):
+        make_note(owner)
+
+    # The jobs reach Redis, but the dispatcher dies before committing the bookkeeping.
+    def crash(*args, **kwargs):
+        raise RuntimeError("dispatcher killed")
+    with monkeypatch.context() as patch:
+        patch.setattr(crud_note, "mark_outbox_dispatched", crash)
+        with pytest.raises(RuntimeError):
+            dispatcher.dispatch_batch(db)
+    db.rollback()
+    assert db.query(NoteOutbox).count() == 3
+    pushed = _queued_job_ids(redis)
+
+    assert dispatcher.dispatch_batch(db) == 3
+    assert db.query(NoteOutbox).count() == 0
+    assert sorted(_queued_job_ids(redis)) == sorted(pushed)
+    assert len(pushed) == 3
+
+
+def test_reconcile_requeues_a_stuck_note(db, redis, make_user, make_note, published):
+    note = make_note(make_user())
+    _make_stuck(db, note)
+
+    assert dispatcher.reconcile(db) == 1
+    db.expire_all()
+    assert crud_note.get_note(db, note_id=note.id).status == NoteStatus.QUEUED
+    assert db.query(NoteOutbox).filter(NoteOutbox.note_id == note.id).count() == 1
+    assert published == [(note.id, NoteStatus.QUEUED)]
+
+
+def test_reconcile_fails_a_note_out_of_attempts(db, redis, make_user, make_note, published):
+    note = make_note(make_user())
+    _make_stuck(db, note, attempts=settings.RECONCILE_MAX_ATTEMPTS)
+
+    assert dispatcher.reconcile(db) == 1
+    db.expire_all()
+    assert crud_note.get_note(db, note_id=note.id).status == NoteStatus.FAILED
+    assert published == [(note.id, NoteStatus.FAILED)]
+
+
+def test_reconcile_does_not_fail_a_note_finished_meanwhile(db, redis, make_user, make_note, published, monkeypatch):
+    note = make_note(make_user())
+    _make_stuck(db, note, attempts=settings.RECONCILE_MAX_ATTEMPTS)
+
+    # A worker writes the result between the reconciler's read and its update.
+    get_stuck_notes = crud_note.get_stuck_notes
+    def finish_after_read(session, **kwargs):
+        notes = get_stuck_notes(session, **kwargs)
+        other = type(session)(bind=session.get_bind())
+        other.query(Note).filter(Note.id == note.id).update({"status": NoteStatus.DONE, "summary": "done"})
+        other.commit()
+        other.close()
+        return notes
+    monkeypatch.setattr(crud_note, "get_stuck_notes", finish_after_read)
+
+    assert dispatcher.reconcile(db) == 0
+    db.expire_all()
+    assert crud_note.get_note(db, note_id=note.id).status == NoteStatus.DONE
+    assert published == []
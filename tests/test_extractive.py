@@ -0,0 +1,50 @@
+# tests/test_extractive.py
+from app.tasks.extractive import split_sentences, summarize, summarize_batch
+
+BILLING = [
+    "The customer called about a double charge on the March invoice.",
+    "She said the invoice showed the same charge twice.",
+    "The agent confirmed the double charge on the invoice.",
+    "A refund for the duplicate charge was issued.",
+    "The weather in Ankara was sunny.",
+    "Her dog barked during the call.",
+    "The agent apologized for the duplicate invoice charge.",
+    "The customer thanked the agent.",
+]
+
+
+def test_sentences_are_split_on_terminal_punctuation():
+    assert split_sentences("First one. Second one! Third? 4 items remain. e.g. not split") == [
+        "First one.", "Second one!", "Third?", "4 items remain. e.g. not split",
+    ]
+
+
+def test_short_text_is_returned_unchanged():
+    assert summarize("Only one sentence here.") == "Only one sentence here."
+    assert summarize("") == ""
+
+
+def test_summary_keeps_the_budget_of_central_sentences_in_order():
+    summary = summarize(" ".join(BILLING), max_sentences=2)
+    kept = split_sentences(summary)
+
+    assert len(kept) == 2
+    assert all("charge" in sentence for sentence in kept)
+    assert kept == sorted(kept, key=BILLING.index)
+
+
+def test_ratio_limits_the_budget(monkeypatch):
+    from app.tasks import extractive
+    monkeypatch.setattr(extractive.settings, "EXTRACTIVE_SUMMARY_RATIO", 0.25)
+    assert len(split_sentences(summarize(" ".join(BILLING), max_sentences=10))) == 2
+
+
+def test_repeated_sentences_are_kept_once():
+    text = " ".join(BILLING + [BILLING[2], BILLING[2]])
+    kept = split_sentences(summarize(text, max_sentences=3))
+    assert len(kept) == len(set(kept)) == 3
+
+
+def test_batch_matches_single_summaries():
+    texts = [" ".join(BILLING), " ".join(BILLING[:5]), "Too short to rank."]
+    assert summarize_batch(texts, max_sentences=2) == [summarize(text, max_sentences=2) for text in texts]
@@ -0,0 +1,74 @@
+# tests/test_fair_queue.py
+from app.core.config import settings
+from app.tasks import fair_queue
+from app.tasks.queue import q
+
+
+def _submit(redis, jobs) -> None:
+    """
+    Pushes (owner_id, weight) jobs to the owners' sub-queues without releasing any.
+    """
+    pipe = redis.pipeline()
+    for index, (owner_id, weight) in enumerate(jobs):
+        fair_queue.enqueue_note(index, owner_id=owner_id, weight=weight, job_id=f"o{owner_id}-{index}", pipeline=pipe)
+    pipe.execute()
+
+
+def _ready_owners(redis):
+    return [int(job_id.decode()[1:].split("-")[0]) for job_id in redis.lrange(q.key, 0, -1)]
+
+
+def test_release_alternates_between_owners(redis):
+    # Owner 1 bulk-submits before owners 2 and 3.
+    _submit(redis, [(1, 1)] * 3 + [(2, 1)] * 2 + [(3, 1)])
+
+    assert fair_queue.backlog_size() == 6
+    assert fair_queue.release(ready_depth=100) == 6
+    assert _ready_owners(redis) == [1, 2, 3, 1, 2, 1]
+    assert fair_queue.backlog_size() == 0
+    assert redis.llen(fair_queue.RING_KEY) == 0
+
+
+def test_release_keeps_each_owners_jobs_in_order(redis):
+    _submit(redis, [(1, 1)] * 3 + [(2, 1)] * 3)
+    fair_queue.release(ready_depth=100)
+    ready = [job_id.decode() for job_id in redis.lrange(q.key, 0, -1)]
+    assert [job_id for job_id in ready if job_id.startswith("o1-")] == ["o1-0", "o1-1", "o1-2"]
+
+
+def test_weighted_owner_gets_more_jobs_per_turn(redis):
+    _submit(redis, [(1, 2)] * 4 + [(2, 1)] * 2)
+    fair_queue.release(ready_depth=100)
+    assert _ready_owners(redis) == [1, 1, 2, 1, 1, 2]
+
+
+def test_release_stops_at_the_ready_depth(redis):
+    _submit(redis, [(1, 1)] * 3 + [(2, 1)] * 3)
+
+    assert fair_queue.release(ready_depth=2) == 2
+    assert _ready_owners(redis) == [1, 2]
+    assert fair_queue.owner_backlogs() == {1: 2, 2: 2}
+
+    # Nothing moves until a worker takes a job off the RQ list.
+    assert fair_queue.release(ready_depth=2) == 0
+    redis.lpop(q.key)
+    assert fair_queue.release(ready_depth=2) == 1
+    assert _ready_owners(redis) == [2, 1]
+
+
+def test_enqueue_releases_up_to_the_configured_depth(redis):
+    for index in range(6):
+        fair_queue.enqueue_note(index, owner_id=1)
+    assert redis.llen(q.key) == settings.FAIR_QUEUE_READY_DEPTH
+    assert fair_queue.backlog_size() == 6 - settings.FAIR_QUEUE_READY_DEPTH
+
+
+def test_remove_takes_a_job_out_wherever_it_waits(redis):
+    _submit(redis, [(1, 1)] * 3)
+    fair_queue.release(ready_depth=1)
+
+    assert fair_queue.remove("o1-0", owner_id=1)  # Released to RQ
+    assert fair_queue.remove("o1-2", owner_id=1)  # Still in the sub-queue
+    assert not fair_queue.remove("o1-2", owner_id=1)
+    assert fair_queue.backlog_size() == 1
+    assert redis.llen(q.key) == 0
@@ -0,0 +1,53 @@
+# tests/test_note_states.py
+from datetime import datetime, timedelta, timezone
+
+from app.crud import note as crud_note
+from app.models.note import NoteOutbox, NoteStatus
+
+
+def _status(db, note_id):
+    db.expire_all()
+    return crud_note.get_note(db, note_id=note_id).status
+
+
+def test_a_note_is_claimed_once(db, make_user, make_note):
+    note = make_note(make_user())
+    assert crud_note.claim_note(db, note_id=note.id)
+    assert not crud_note.claim_note(db, note_id=note.id)
+    assert _status(db, note.id) == NoteStatus.PROCESSING
+
+
+def test_cancelled_note_is_never_claimed(db, make_user, make_note):
+    note = make_note(make_user())
+    assert crud_note.cancel_note(db, note_id=note.id)
+    assert not crud_note.claim_note(db, note_id=note.id)
+    assert _status(db, note.id) == NoteStatus.CANCELLED
+    assert db.query(NoteOutbox).filter(NoteOutbox.note_id == note.id).count() == 0
+
+
+def test_cancel_during_processing_wins_over_the_result(db, make_user, make_note):
+    note = make_note(make_user())
+    assert crud_note.claim_note(db, note_id=note.id)
+    assert crud_note.cancel_note(db, note_id=note.id)
+
+    finished = crud_note.finish_note(db, note_id=note.id, values={"status": NoteStatus.DONE, "summary": "late"})
+    assert finished is None
+    assert _status(db, note.id) == NoteStatus.CANCELLED
+
+
+def test_finished_note_cannot_be_cancelled(db, make_user, make_note):
+    note = make_note(make_user())
+    crud_note.claim_note(db, note_id=note.id)
+    assert crud_note.finish_note(db, note_id=note.id, values={"status": NoteStatus.DONE, "summary": "s"}) is not None
+    assert not crud_note.cancel_note(db, note_id=note.id)
+    assert _status(db, note.id) == NoteStatus.DONE
+
+
+def test_overdue_note_is_expired_not_claimed(db, make_user, make_note):
+    note = make_note(make_user(), deadline_seconds=60)
+    note.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+
+    assert not crud_note.claim_note(db, note_id=note.id)
+    assert crud_note.expire_note(db, note_id=note.id)
+    assert _status(db, note.id) == NoteStatus.EXPIRED
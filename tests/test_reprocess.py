@@ -0,0 +1,86 @@
+# tests/test_reprocess.py
+import pytest
+
+from app.core.config import settings
+from app.crud import note as crud_note
+from app.models.note import Note, NoteStatus, SummaryEngine
+from app.schemas.note import NoteReprocessRequest
+from app.tasks import cancellation
+from app.tasks.reprocess import reprocess_notes
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "REPROCESS_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "REPROCESS_BATCH_PAUSE_SECONDS", 0)
+
+
+def _fail(db, note_ids):
+    db.query(Note).filter(Note.id.in_(note_ids)).update(
+        {"status": NoteStatus.FAILED, "failure_reason": "model is not available"}, synchronize_session=False
+    )
+    db.commit()
+
+
+def _statuses(db):
+    db.expire_all()
+    return {note.id: note.status for note in db.query(Note).order_by(Note.id)}
+
+
+def test_reprocessing_resets_results_and_abort_flags(db, redis, make_user, make_note):
+    owner = make_user()
+    done, cancelled = make_note(owner), make_note(owner)
+    crud_note.claim_note(db, note_id=done.id)
+    crud_note.finish_note(db, note_id=done.id, values={
+        "status": NoteStatus.DONE, "summary": "old", "engine": SummaryEngine.ABSTRACTIVE,
+        "processing_time_ms": 12.0, "stage_timings": {"tokenize_ms": 1.0},
+    })
+    crud_note.cancel_note(db, note_id=cancelled.id)
+    cancellation.withdraw(cancelled)
+    assert cancellation.abort_requested(cancelled.id)
+
+    result = reprocess_notes(db, criteria=NoteReprocessRequest(statuses=[NoteStatus.DONE, NoteStatus.CANCELLED]))
+
+    assert result.requeued == 2
+    assert not cancellation.abort_requested(cancelled.id)
+    assert crud_note.claim_note(db, note_id=cancelled.id)
+    db.expire_all()
+    note = crud_note.get_note(db, note_id=done.id)
+    assert note.status == NoteStatus.QUEUED
+    assert (note.summary, note.engine, note.processing_time_ms, note.stage_timings) == (None, None, None, None)
+
+
+def test_dry_run_only_counts(db, redis, make_user, make_note):
+    _fail(db, [make_note(make_user()).id])
+
+    result = reprocess_notes(db, criteria=NoteReprocessRequest(dry_run=True))
+    assert (result.matched, result.requeued, result.dry_run) == (1, 0, True)
+    assert set(_statuses(db).values()) == {NoteStatus.FAILED}
+
+
+def test_one_batch_per_call_returns_a_cursor(db, redis, make_user, make_note, small_batches):
+    owner = make_user()
+    ids = [make_note(owner).id for _ in range(5)]
+    _fail(db, ids)
+
+    first = reprocess_notes(db, criteria=NoteReprocessRequest(), max_batches=1)
+    assert (first.matched, first.requeued, first.batches, first.next_after_id) == (5, 2, 1, ids[1])
+
+    # A requeued note that fails again before the run is over is not selected twice.
+    _fail(db, ids[:1])
+    second = reprocess_notes(db, criteria=NoteReprocessRequest(after_id=first.next_after_id), max_batches=1)
+    assert (second.matched, second.requeued, second.next_after_id) == (3, 2, ids[3])
+
+    last = reprocess_notes(db, criteria=NoteReprocessRequest(after_id=second.next_after_id), max_batches=1)
+    assert (last.requeued, last.next_after_id) == (1, None)
+    assert _statuses(db) == {ids[0]: NoteStatus.FAILED, **{note_id: NoteStatus.QUEUED for note_id in ids[1:]}}
+
+
+def test_full_run_walks_all_batches(db, redis, make_user, make_note, small_batches):
+    owner = make_user()
+    ids = [make_note(owner).id for _ in range(5)]
+    _fail(db, ids)
+
+    result = reprocess_notes(db, criteria=NoteReprocessRequest())
+    assert (result.matched, result.requeued, result.batches, result.next_after_id) == (5, 5, 3, None)
+    assert set(_statuses(db).values()) == {NoteStatus.QUEUED}
@@ -0,0 +1,54 @@
+# tests/test_responses.py
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.core.responses import csv_stream, model_response
+from app.models.note import NoteStatus
+from app.schemas.note import NotePublic
+
+
+def _read(rows, columns):
+    return list(csv.reader(io.StringIO(b"".join(csv_stream(rows, columns)).decode("utf-8"))))
+
+
+def test_csv_neutralizes_formulas():
+    rows = [(1, "=HYPERLINK(\"http://example.com\")", "+1", "-1+2", "@SUM(A1)", "\tx")]
+    header, row = _read(rows, ["id", "a", "b", "c", "d", "e"])
+    assert row == ["1", "'=HYPERLINK(\"http://example.com\")", "'+1", "'-1+2", "'@SUM(A1)", "'\tx"]
+
+
+def test_csv_keeps_plain_values():
+    rows = [(-1.5, "A normal summary - with a dash.", None, {"tokenize_ms": 1.0})]
+    header, row = _read(rows, ["a", "b", "c", "d"])
+    assert header == ["a", "b", "c", "d"]
+    assert row == ["-1.5", "A normal summary - with a dash.", "", '{"tokenize_ms": 1.0}']
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2025, 1, 1, 8, 30, 15, 250000, tzinfo=timezone.utc),
+    datetime(2025, 1, 1, 8, 30, 15, tzinfo=timezone(timedelta(hours=3))),
+    datetime(2025, 1, 1, 8, 30, 15),  # SQLite returns naive datetimes
+])
+def test_model_response_matches_a_response_model_endpoint(created_at):
+    adapter = TypeAdapter(List[NotePublic])
+    notes = [SimpleNamespace(
+        id=1, status=NoteStatus.DONE, raw_text="Müşteri aradı.", summary="Refund asked.",
+        failure_reason=None, processing_time_ms=812.5, engine=None,
+        stage_timings={"queue_wait_ms": 0.1, "claim_ms": 12.0}, created_at=created_at,
+        expires_at=None, owner=SimpleNamespace(id=1, email="agent@example.com"),
+    )]
+    app = FastAPI()
+
+    @app.get("/notes", response_model=List[NotePublic])
+    def list_notes():
+        return notes
+
+    assert model_response(adapter, notes).body == TestClient(app).get("/notes").content
@@ -0,0 +1,29 @@
+# tests/test_security.py
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.core import security
+
+
+@pytest.fixture
+def hash_pool():
+    executor = security.start_password_executor()
+    yield executor
+    security.shutdown_password_executor()
+
+
+def test_pool_does_not_fork_the_api_process(hash_pool):
+    assert hash_pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+
+def test_pool_is_replaced_after_a_child_dies(hash_pool):
+    hashed = security.get_password_hash("correct horse")
+    child = next(iter(hash_pool._processes.values()))
+    os.kill(child.pid, signal.SIGKILL)
+    child.join()
+
+    assert asyncio.run(security.verify_password_async("correct horse", hashed))
+    assert security.start_password_executor() is not hash_pool
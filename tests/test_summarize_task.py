@@ -0,0 +1,254 @@
+# tests/test_summarize_task.py
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.crud import note as crud_note  # noqa: E402
+from app.models.note import NoteStatus, SummaryEngine  # noqa: E402
+from app.tasks import summarize_task  # noqa: E402
+
+
+@pytest.fixture
+def worker(db, redis, monkeypatch):
+    """
+    Runs _summarize_note with the extractive engine and records what it announces.
+    """
+    announced = {"published": [], "cached": []}
+    monkeypatch.setattr(summarize_task, "_choose_engine", lambda: (SummaryEngine.EXTRACTIVE, "requested"))
+    monkeypatch.setattr(summarize_task, "publish_status", lambda note_id, status: announced["published"].append(status))
+    monkeypatch.setattr(summarize_task.note_cache, "store_note", lambda db, note, **kwargs: announced["cached"].append(note.id))
+    return announced
+
+
+def _cancel_from_the_api(note_id):
+    session = SessionLocal()
+    try:
+        assert crud_note.cancel_note(session, note_id=note_id)
+    finally:
+        session.close()
+
+
+def _status(db, note_id):
+    db.expire_all()
+    return crud_note.get_note(db, note_id=note_id).status
+
+
+def test_result_is_written_and_announced(db, make_user, make_note, worker, monkeypatch):
+    note = make_note(make_user())
+    monkeypatch.setattr(summarize_task.extractive, "summarize", lambda text: "A summary.")
+
+    summarize_task._summarize_note(note.id)
+
+    assert _status(db, note.id) == NoteStatus.DONE
+    assert worker["published"] == [NoteStatus.PROCESSING, NoteStatus.DONE]
+    assert worker["cached"] == [note.id]
+
+
+def test_cancel_during_generation_is_not_overwritten_with_done(db, make_user, make_note, worker, monkeypatch):
+    note = make_note(make_user())
+
+    def cancelled_meanwhile(text):
+        _cancel_from_the_api(note.id)
+        return "A summary nobody wants any more."
+    monkeypatch.setattr(summarize_task.extractive, "summarize", cancelled_meanwhile)
+
+    summarize_task._summarize_note(note.id)
+
+    assert _status(db, note.id) == NoteStatus.CANCELLED
+    assert worker["published"] == [NoteStatus.PROCESSING]
+    assert worker["cached"] == []
+
+
+def test_cancel_during_a_failing_job_is_not_overwritten_with_failed(db, make_user, make_note, worker, monkeypatch):
+    note = make_note(make_user())
+
+    def cancelled_then_failed(text):
+        _cancel_from_the_api(note.id)
+        raise RuntimeError("generation failed")
+    monkeypatch.setattr(summarize_task.extractive, "summarize", cancelled_then_failed)
+
+    summarize_task._summarize_note(note.id)
+
+    assert _status(db, note.id) == NoteStatus.CANCELLED
+    assert worker["published"] == [NoteStatus.PROCESSING]
+
+
+def test_failure_is_recorded(db, make_user, make_note, worker, monkeypatch):
+    note = make_note(make_user())
+
+    def failing(text):
+        raise RuntimeError("generation failed")
+    monkeypatch.setattr(summarize_task.extractive, "summarize", failing)
+
+    summarize_task._summarize_note(note.id)
+
+    db.expire_all()
+    failed = crud_note.get_note(db, note_id=note.id)
+    assert (failed.status, failed.failure_reason) == (NoteStatus.FAILED, "generation failed")
+    assert worker["published"] == [NoteStatus.PROCESSING, NoteStatus.FAILED]
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(summarize_task, "get_current_job", lambda: None)
+    monkeypatch.setattr(summarize_task, "record_completion", lambda: recorded.append(True))
+    return recorded
+
+
+@pytest.mark.parametrize("profiled", [False, True])
+def test_completion_is_recorded_for_a_summarized_note(db, make_user, make_note, worker, completions, monkeypatch, profiled):
+    note = make_note(make_user())
+    monkeypatch.setattr(summarize_task.extractive, "summarize", lambda text: "A summary.")
+    monkeypatch.setattr(summarize_task.settings, "PROFILE_SAMPLE_RATE", 1 if profiled else 0)
+
+    summarize_task.summarize_text_task(note.id)
+
+    assert completions == [True]
+
+
+def test_stale_and_failed_jobs_are_not_recorded_as_completions(db, make_user, make_note, worker, completions, monkeypatch):
+    note = make_note(make_user())
+
+    def failing(text):
+        raise RuntimeError("generation failed")
+    monkeypatch.setattr(summarize_task.extractive, "summarize", failing)
+
+    summarize_task.summarize_text_task(note.id)  # fails the note
+    summarize_task.summarize_text_task(note.id)  # a duplicate delivery: nothing to claim
+
+    assert completions == []
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Engine choice
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+@pytest.fixture
+def loaded_model(monkeypatch):
+    monkeypatch.setattr(summarize_task, "model", object())
+    monkeypatch.setattr(summarize_task, "tokenizer", object())
+    monkeypatch.setattr(summarize_task.settings, "EXTRACTIVE_FALLBACK_BACKLOG", 100)
+
+
+def _backlog(monkeypatch, depth):
+    monkeypatch.setattr(summarize_task, "get_queue_state", lambda: SimpleNamespace(depth=depth))
+
+
+def test_extractive_engine_without_a_model(monkeypatch):
+    monkeypatch.setattr(summarize_task, "model", None)
+    assert summarize_task._choose_engine() == (SummaryEngine.EXTRACTIVE, "model_unavailable")
+
+
+def test_model_is_used_below_the_backlog_threshold(loaded_model, monkeypatch):
+    _backlog(monkeypatch, 99)
+    assert summarize_task._choose_engine() == (SummaryEngine.ABSTRACTIVE, "default")
+
+
+def test_extractive_engine_at_the_backlog_threshold(loaded_model, monkeypatch):
+    _backlog(monkeypatch, 100)
+    assert summarize_task._choose_engine() == (SummaryEngine.EXTRACTIVE, "overload")
+
+
+def test_model_is_used_when_the_backlog_is_unknown(loaded_model, monkeypatch):
+    def unreachable():
+        raise ConnectionError("Redis is down")
+    monkeypatch.setattr(summarize_task, "get_queue_state", unreachable)
+    assert summarize_task._choose_engine() == (SummaryEngine.ABSTRACTIVE, "default")
+
+
+def test_threshold_of_zero_disables_the_fallback(loaded_model, monkeypatch):
+    monkeypatch.setattr(summarize_task.settings, "EXTRACTIVE_FALLBACK_BACKLOG", 0)
+    _backlog(monkeypatch, 10_000)
+    assert summarize_task._choose_engine() == (SummaryEngine.ABSTRACTIVE, "default")
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Long documents
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+
+def _words(text):
+    return list(range(len(text.split())))
+
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    """
+    One token per whitespace-separated word, so chunk sizes are easy to follow.
+    """
+    def tokenize(texts, add_special_tokens=True):
+        if isinstance(texts, str):
+            return SimpleNamespace(input_ids=_words(texts))
+        return SimpleNamespace(input_ids=[_words(text) for text in texts])
+    monkeypatch.setattr(summarize_task, "tokenizer", tokenize)
+
+
+def _sentences(count, words=4):
+    return [f"Sentence {index} {'word ' * (words - 3)}end." for index in range(count)]
+
+
+def test_text_within_the_limit_is_one_chunk(word_tokenizer):
+    text = " ".join(_sentences(2))
+    assert summarize_task.chunk_text(text, chunk_tokens=10, overlap_sentences=1) == [text]
+
+
+def test_consecutive_chunks_share_the_overlap(word_tokenizer):
+    sentences = _sentences(5)
+    chunks = summarize_task.chunk_text(" ".join(sentences), chunk_tokens=10, overlap_sentences=1)
+
+    assert chunks == [" ".join(sentences[index:index + 2]) for index in range(4)]
+    assert all(summarize_task.count_tokens(chunk) <= 10 for chunk in chunks)
+
+
+def test_without_overlap_chunks_partition_the_text(word_tokenizer):
+    sentences = _sentences(5)
+    chunks = summarize_task.chunk_text(" ".join(sentences), chunk_tokens=10, overlap_sentences=0)
+    assert chunks == [" ".join(sentences[0:2]), " ".join(sentences[2:4]), sentences[4]]
+
+
+def test_overlong_sentence_is_a_chunk_of_its_own(word_tokenizer):
+    short_before, long_sentence, short_after = _sentences(1)[0], _sentences(1, words=10)[0], _sentences(1)[0]
+    chunks = summarize_task.chunk_text(
+        " ".join([short_before, long_sentence, short_after]), chunk_tokens=6, overlap_sentences=1
+    )
+    # The overlap is dropped wherever it would not leave room for the next sentence.
+    assert chunks == [short_before, long_sentence, short_after]
+
+
+@pytest.fixture
+def long_documents(word_tokenizer, monkeypatch):
+    monkeypatch.setattr(summarize_task.settings, "SUMMARY_MAX_INPUT_TOKENS", 20)
+    monkeypatch.setattr(summarize_task.settings, "SUMMARY_CHUNK_TOKENS", 10)
+    monkeypatch.setattr(summarize_task.settings, "SUMMARY_CHUNK_OVERLAP_SENTENCES", 1)
+    monkeypatch.setattr(summarize_task.settings, "SUMMARY_MAX_MAP_PASSES", 2)
+    calls = []
+
+    def use(summarize_chunk):
+        def summarize_batch(texts, should_stop=None):
+            calls.append(len(texts))
+            return [summarize_chunk(text) for text in texts], {"encoder": 1.0}
+        monkeypatch.setattr(summarize_task, "summarize_batch", summarize_batch)
+        return calls
+    return use
+
+
+def test_long_text_is_mapped_then_reduced(long_documents):
+    calls = long_documents(lambda text: "Short.")
+    summary, stats = summarize_task.summarize(" ".join(_sentences(10)))
+
+    # 40 tokens: one map pass over 9 overlapping chunks fits the 20 token limit.
+    assert summary == "Short."
+    assert calls == [9, 1]
+    assert (stats["map_passes"], stats["chunks"], stats["encoder"]) == (1, 9, 2.0)
+
+
+def test_map_passes_are_capped(long_documents):
+    calls = long_documents(lambda text: text)  # summaries that never get shorter
+    summary, stats = summarize_task.summarize(" ".join(_sentences(10)))
+
+    assert stats["map_passes"] == 2
+    assert len(calls) == 3 and calls[-1] == 1